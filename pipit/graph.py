@@ -15,7 +15,9 @@ class Node:
         self.parent = parent
 
         if level is None:
-            self.level = self._calculate_level()
+            # the parent's level is already known, so there's no need to walk
+            # all the way up to the root
+            self.level = 0 if parent is None else parent.level + 1
         else:
             self.level = level
 
@@ -38,17 +40,19 @@ class Node:
         if node is None:
             return None
 
-        if self.get_level() > node.get_level():
+        # The levels are stored on the nodes, and nodes are compared by
+        # identity, so the walk below doesn't need any method calls
+        if self.level > node.level:
             node1 = self
             node2 = node
         else:
             node1 = node
             node2 = self
 
-        while node1.get_level() > node2.get_level():
+        while node1.level > node2.level:
             node1 = node1.parent
 
-        while node1 != node2:
+        while node1 is not node2:
             node1 = node1.parent
             node2 = node2.parent
 
@@ -71,13 +75,6 @@ class Node:
     def __str__(self) -> str:
         return "ID: " + str(self._pipit_nid) + " -- Level: " + str(self.level)
 
-    def _calculate_level(self):
-        """private function to get depth of node"""
-        if self.parent is None:
-            return 0
-        else:
-            return 1 + self.parent._calculate_level()
-
     def __eq__(self, obj) -> bool:
         if isinstance(obj, Node):
             return self._pipit_nid == obj._pipit_nid
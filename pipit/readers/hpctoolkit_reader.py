@@ -4,30 +4,209 @@
 # SPDX-License-Identifier: MIT
 
 
+import mmap
+import multiprocessing as mp
+import os
+import struct
+
+import numpy as np
 import pandas as pd
 import pipit.trace
 from pipit.graph import Graph, Node
 
+# Fixed-size records of the .db formats (all fields are little-endian)
+
+# common .db header, after the magic and format identifiers:
+#   major version (u8), minor version (u8)
+_COMMON_HEADER_VERSION = struct.Struct("<BB")
+# common .db header, entry of the section table:
+#   section size (u64), section pointer (u64)
+_COMMON_HEADER_SECTION = struct.Struct("<QQ")
+
+# meta.db General Properties section:
+#   pTitle (u64), pDescription (u64)
+_META_GENERAL_PROPERTIES = struct.Struct("<QQ")
+# meta.db Identifier Names section header:
+#   ppNames (u64), nKinds (u8)
+_META_IDENTIFIER_NAMES_SECTION = struct.Struct("<QB")
+# meta.db Load Modules, Source Files and Functions section headers:
+#   pointer to the array (u64), number of entries (u32), size of an entry (u16)
+_META_ARRAY_SECTION = struct.Struct("<QIH")
+# meta.db Function Specification:
+#   pName (u64), pModule (u64), offset (u64), pFile (u64), line (u32),
+#   flags (u32)
+_META_FUNCTION_SPECIFICATION = struct.Struct("<QQQQI4x")
+# meta.db Context Tree section header:
+#   pEntryPoints (u64), nEntryPoints (u16), szEntryPoint (u8)
+_META_CONTEXT_TREE_SECTION = struct.Struct("<QHB")
+# meta.db Entry Point:
+#   szChildren (u64), pChildren (u64), ctxId (u32), entryPoint (u16),
+#   padding (2 bytes), pPrettyName (u64)
+_META_ENTRY_POINT = struct.Struct("<QQIH2xQ")
+# meta.db Context, without its flex words:
+#   szChildren (u64), pChildren (u64), ctxId (u32), flags (u8),
+#   relation (u8), lexicalType (u8), nFlexWords (u8), propagation (u16),
+#   padding (6 bytes)
+_META_CONTEXT = struct.Struct("<QQIBBBBH6x")
+# meta.db Context flex word holding a pointer or an offset (u64)
+_META_FLEX_WORD = struct.Struct("<Q")
+# meta.db Context flex word holding a source line (read as a u16)
+_META_FLEX_LINE = struct.Struct("<H")
+
+# profile.db Hierarchical Identifier Tuple header:
+#   nIds (u16), followed by 6 bytes of padding
+_HIT_HEADER = struct.Struct("<H6x")
+# profile.db identification inside a Hierarchical Identifier Tuple:
+#   kind (u8), padding (1 byte), flags (u16), logicalId (u32), physicalId (u64)
+# (a NumPy dtype, so that all identifications of a tuple can be viewed as an
+# array)
+_HIT_IDENTIFIER = np.dtype(
+    {
+        "names": ["kind", "flags", "logical_id", "physical_id"],
+        "formats": ["u1", "<u2", "<u4", "<u8"],
+        "offsets": [0, 2, 4, 8],
+        "itemsize": 16,
+    }
+)
+# profile.db Profiles Information section header:
+#   pProfiles (u64), nProfiles (u32), szProfile (u8)
+_PROFILES_SECTION = struct.Struct("<QIB")
+# profile.db Profile Info:
+#   valueBlock (0x20 bytes), pIdTuple (u64), flags (u32)
+_PROFILE_INFO = struct.Struct("<32sQI")
+# trace.db Context Trace Headers section header:
+#   pTraces (u64), nTraces (u32), szTrace (u8), padding (3 bytes),
+#   minTimestamp (u64), maxTimestamp (u64)
+_TRACE_HEADERS_SECTION = struct.Struct("<QIB3xQQ")
+# trace.db trace line element:
+#   timestamp (u64), ctxId (u32)
+# (a NumPy dtype, so that a whole trace line can be viewed as an array)
+_TRACE_ELEMENT = np.dtype([("timestamp", "<u8"), ("context_id", "<u4")])
+
+
+def _trace_header_dtype(trace_header_size: int) -> np.dtype:
+    """
+    Returns the NumPy dtype of a trace.db Context Trace Header, so that all the
+    headers can be viewed as one array:
+      profIndex (u32), padding (4 bytes), pStart (u64), pEnd (u64)
+    The size of a header is given in the file (currently 24), so anything
+    after these fields is skipped.
+    """
+    return np.dtype(
+        {
+            "names": ["profile_index", "start_pointer", "end_pointer"],
+            "formats": ["<u4", "<u8", "<u8"],
+            "offsets": [0, 8, 16],
+            "itemsize": trace_header_size,
+        }
+    )
+
+
+def _path_specification_dtype(specification_size: int) -> np.dtype:
+    """
+    Returns the NumPy dtype of a meta.db Load Module Specification or Source
+    File Specification, so that all the specifications of a section can be
+    viewed as one array:
+      flags (u32), padding (4 bytes), pPath (u64)
+    Only the path pointer is used. The size of a specification is given in the
+    file (currently 16), so anything after it is skipped.
+    """
+    return np.dtype(
+        {
+            "names": ["path_pointer"],
+            "formats": ["<u8"],
+            "offsets": [8],
+            "itemsize": specification_size,
+        }
+    )
+
+
+def _open_db_file(file_location: str):
+    """
+    Opens a profile.db or trace.db file for reading in binary mode. These are
+    read through in bulk, so we ask the kernel not to update their access
+    times, and to read ahead aggressively, where the platform supports it.
+    """
+    flags = os.O_RDONLY | getattr(os, "O_BINARY", 0)
+    try:
+        fd = os.open(file_location, flags | getattr(os, "O_NOATIME", 0))
+    except PermissionError:
+        # O_NOATIME is only allowed for the owner of the file
+        fd = os.open(file_location, flags)
+
+    if hasattr(os, "posix_fadvise"):
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+
+    return os.fdopen(fd, "rb")
+
+
+def _unpack_common_header(mm: mmap.mmap, num_sections: int) -> tuple:
+    """
+    Unpacks the versions and the section table of the common .db header
+    version 4.0 from a mapped .db file. Returns the major version, the minor
+    version, and the list of section sizes and section pointers.
+    """
+    # The two version bytes (u8 each) come after the 10 byte magic identifier
+    # and the 4 byte format identifier
+    major_version, minor_version = _COMMON_HEADER_VERSION.unpack_from(mm, 14)
+
+    # In the header each section is given 16 bytes:
+    #   - First 8 bytes specify the total size of the section (in bytes)
+    #   - Last 8 bytes specify a pointer to the beggining of the section
+    # The whole table is unpacked straight out of the mapped file.
+    section_sizes = []
+    section_pointers = []
+    section_table_end = 16 + num_sections * _COMMON_HEADER_SECTION.size
+    for section_size, section_pointer in _COMMON_HEADER_SECTION.iter_unpack(
+        mm[16:section_table_end]
+    ):
+        section_sizes.append(section_size)
+        section_pointers.append(section_pointer)
+
+    return major_version, minor_version, section_sizes, section_pointers
+
 
 class MetaReader:
     # adds new context id and return new nid
-    def _add_context_id(self, context_id) -> int:
-        self.nid_to_ctx[self.current_nid] = context_id
+    def _add_context_id(self, context_id, parent_nid) -> int:
+        nid = self.current_nid
+        if nid == len(self.node_parent):
+            # out of room, so double the capacity of the flat node arrays
+            self.node_parent = np.concatenate(
+                (self.node_parent, np.empty_like(self.node_parent))
+            )
+            self.node_level = np.concatenate(
+                (self.node_level, np.empty_like(self.node_level))
+            )
+
+        self.nid_to_ctx[nid] = context_id
+        self.node_parent[nid] = parent_nid
+        self.node_level[nid] = (
+            0 if parent_nid == -1 else self.node_level[parent_nid] + 1
+        )
         self.current_nid += 1
-        return self.current_nid - 1
+        return nid
 
     def __init__(self, file_location):
         # open the file to ready in binary mode (rb)
         self.file = open(file_location, "rb")
 
-        # setting necessary read options
-        self.byte_order = "little"
-        self.signed = False
-        self.encoding = "ASCII"
+        # The context tree jumps all over the file, which is the worst case
+        # for buffered reads (every seek throws away the buffer). So map the
+        # whole file into memory and unpack records straight out of it, at
+        # their offsets, instead of seeking and reading.
+        self.mm = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+
         self.current_nid = 0
         self.nid_to_ctx = {}
         self.node_map = {}
 
+        # The CCT is built as flat arrays indexed by nid (parent nid, or -1
+        # for roots, and depth of each node), which are grown as needed.
+        # Node objects are only created once the whole tree has been read.
+        self.node_parent = np.empty(1024, dtype=np.int32)
+        self.node_level = np.empty(1024, dtype=np.int32)
+
         # The meta.db header consists of the common .db header and n sections.
         # We're going to do a little set up work, so that's easy to change if
         # any revisions change the orders.
@@ -115,21 +294,13 @@ class MetaReader:
             return {
                 "module": "",
                 "file": "",
-                "function": self.common_strings[context["string_index"]],
+                "function": self.__get_common_string(context["string_index"]),
                 "relation": -1,
                 "lexical_type": -1,
                 "line": -1,
                 "loop_type": False,
             }
 
-            # return self.common_strings[context["string_index"]]
-        # context = {"relation": relation, "lexical_type": lexical_type, \
-        #                "function_index": function_index, \
-        #                "source_file_index": source_file_index, \
-        #                "source_file_line": source_file_line, \
-        #                "load_module_index":load_module_index, \
-        #                "load_module_offset": load_module_offset}
-
         load_module_index = context["load_module_index"]
         source_file_index = context["source_file_index"]
         source_file_line = context["source_file_line"]
@@ -149,26 +320,21 @@ class MetaReader:
         elif function_index is not None:
             # The function map
             function = self.functions_list[function_index]
-            # current_function_map = {"string_index": function_name_index, \
-            #                         "source_line": source_line,
-            #                         "load_modules_index": load_module_index, \
-            #                         "source_file_index": source_file_index}
 
             # getting function name
-            function_string = self.common_strings[function["string_index"]]
+            function_string = self.__get_common_string(function["string_index"])
         else:
             # function is unkown
             function_string = "<unkown function>"
 
         if load_module_index is not None:
-            load_module = self.load_modules_list[load_module_index]
-            module_string = self.common_strings[load_module["string_index"]]
+            module_string = self.__get_common_string(
+                self.load_modules_list[load_module_index]
+            )
         if source_file_index is not None:
-            source_file = self.source_files_list[source_file_index]
-            source_file_string = self.common_strings[source_file["string_index"]]
-        # if function_index is not None:
-        #     function = self.functions_list[function_index]
-        #     function_string = self.common_strings[function["string_index"]]
+            source_file_string = self.__get_common_string(
+                self.source_files_list[source_file_index]
+            )
         if source_file_line is not None:
             file_line = str(source_file_line)
         return {
@@ -187,39 +353,21 @@ class MetaReader:
         """
 
         # read Magic identifier ("HPCPROF-tracedb_")
-        # first ten buyes are HPCTOOLKIT in ASCII
-        identifier = str(self.file.read(10), encoding=self.encoding)
-        assert identifier == "HPCTOOLKIT"
+        # first ten bytes are HPCTOOLKIT in ASCII, which we compare as bytes
+        # (there is no need to decode them just to compare them)
+        assert self.mm[0:10] == b"HPCTOOLKIT"
 
         # next 4 bytes (u8) are the "Specific format identifier"
-        format_identifier = str(self.file.read(4), encoding=self.encoding)
-        assert format_identifier == "meta"
-
-        # next byte (u8) contains the "Common major version, currently 4"
-        self.major_version = int.from_bytes(
-            self.file.read(1), byteorder=self.byte_order, signed=self.signed
-        )
-        # next byte (u8) contains the "Specific minor version"
-        self.minor_version = int.from_bytes(
-            self.file.read(1), byteorder=self.byte_order, signed=self.signed
-        )
+        assert self.mm[10:14] == b"meta"
 
-        self.section_pointer = []
-        self.section_size = []
-        # In the header each section is given 16 bytes:
-        #   - First 8 bytes specify the total size of the section (in bytes)
-        #   - Last 8 bytes specify a pointer to the beggining of the section
-        for i in range(len(self.read_order)):
-            self.section_size.append(
-                int.from_bytes(
-                    self.file.read(8), byteorder=self.byte_order, signed=self.signed
-                )
-            )
-            self.section_pointer.append(
-                int.from_bytes(
-                    self.file.read(8), byteorder=self.byte_order, signed=self.signed
-                )
-            )
+        # next 2 bytes (u8 each) contain the "Common major version, currently
+        # 4" and the "Specific minor version", followed by the section table
+        (
+            self.major_version,
+            self.minor_version,
+            self.section_size,
+            self.section_pointer,
+        ) = _unpack_common_header(self.mm, len(self.read_order))
 
     def __read_general_properties_section(
         self, section_pointer: int, section_size: int
@@ -232,51 +380,70 @@ class MetaReader:
         self.database_description: Human-readable Markdown description of the database.
         """
 
-        # go to the right spot in the file
-        self.file.seek(section_pointer)
-        title_pointer = int.from_bytes(
-            self.file.read(8), byteorder=self.byte_order, signed=self.signed
-        )
-        description_pointer = int.from_bytes(
-            self.file.read(8), byteorder=self.byte_order, signed=self.signed
+        title_pointer, description_pointer = _META_GENERAL_PROPERTIES.unpack_from(
+            self.mm, section_pointer
         )
 
         self.database_title = self.__read_string(title_pointer)
         self.database_description = self.__read_string(description_pointer)
 
-    def __get_common_string(self, string_pointer: int) -> str:
-        """Given the file pointer to find string, returns the string."""
-        if string_pointer in self.common_string_index_map:
-            return self.common_strings[self.common_string_index_map[string_pointer]]
-        else:
-            return None
+    def __get_common_string(self, string_index: int) -> str:
+        """
+        Given the index of a string in the Common String Table, returns the
+        string. Strings are decoded on first use and cached afterwards.
+        """
+        if string_index not in self.common_strings:
+            start = self.common_string_offsets[string_index]
+            end = self.common_string_table.find(b"\0", start)
+            self.common_strings[string_index] = self.common_string_table[
+                start:end
+            ].decode("UTF-8")
+        return self.common_strings[string_index]
+
+    def __get_common_string_index(self, string_pointer: int) -> int:
+        """
+        Given the file pointer to a string in the Common String Table, returns
+        the index of that string.
+        """
+        offset = string_pointer - self.common_string_table_pointer
+        index = int(np.searchsorted(self.common_string_offsets, offset))
+        assert self.common_string_offsets[index] == offset
+        return index
+
+    def __get_common_string_indices(self, string_pointers: np.ndarray) -> list:
+        """
+        Given an array of file pointers to strings in the Common String Table,
+        returns the list of the indices of those strings.
+        """
+        offsets = string_pointers.astype(np.int64) - self.common_string_table_pointer
+        indices = np.searchsorted(self.common_string_offsets, offsets)
+        assert np.array_equal(self.common_string_offsets[indices], offsets)
+        return indices.tolist()
 
     def __read_common_string_table_section(
         self, section_pointer: int, section_size: int
     ) -> None:
-        # Let's go to the section
-        self.file.seek(section_pointer)
-
         # We know that this section is just a densely packed list of strings,
-        # seperated by the null character
-        # So to create a list of these strings, we'll read them all into one string then
-        # split them by the null character
-
-        # Reading entire section into a string
-        total_section: str = str(self.file.read(section_size), encoding="UTF-8")
-
-        # Splitting entire section into list of strings
-        self.common_strings: list[str] = total_section.split("\0")
-
-        # Now we are creating a map between the original location to the string
-        # to the index of the string in self.common_strings.
-        # This is because we are passed pointers to find the string in other sections
-        pointer_index = section_pointer
-        # pointer_index = 0
-        self.common_string_index_map: dict = {}
-        for i in range(len(self.common_strings)):
-            self.common_string_index_map[pointer_index] = i
-            pointer_index += len(self.common_strings[i]) + 1
+        # seperated by the null character.
+        # Most of these strings are never referenced by the sections we read,
+        # so instead of splitting and decoding all of them up front, we keep
+        # the raw section around and only locate where each string starts.
+        # Strings are then decoded lazily by __get_common_string.
+        self.common_string_table_pointer = section_pointer
+        self.common_string_table: bytes = self.mm[
+            section_pointer : section_pointer + section_size
+        ]
+
+        # Offset (from the start of the section) of every string: each string
+        # is terminated by a null character, so the next one starts right
+        # after it
+        null_offsets = np.flatnonzero(
+            np.frombuffer(self.common_string_table, dtype=np.uint8) == 0
+        )
+        self.common_string_offsets = np.concatenate(([0], null_offsets[:-1] + 1))
+
+        # cache of the strings that have been decoded, keyed by index
+        self.common_strings: dict = {}
 
     def __get_load_modules_index(self, load_module_pointer: int) -> int:
         """
@@ -293,58 +460,42 @@ class MetaReader:
         """
         Reads the "Load Modules" Section of meta.db.
         """
-        # go to the right spot in meta.db
-        self.file.seek(section_pointer)
-
-        # Load modules used in this database
-        self.load_modules_pointer = int.from_bytes(
-            self.file.read(8), byteorder=self.byte_order, signed=self.signed
-        )
-        # Number of load modules listed in this section (u32)
-        num_load_modules = int.from_bytes(
-            self.file.read(4), byteorder=self.byte_order, signed=self.signed
-        )
-        # Size of a Load Module Specification, currently 16 (u16)
-        self.load_module_size = int.from_bytes(
-            self.file.read(2), byteorder=self.byte_order, signed=self.signed
-        )
+        # The section header is unpacked in one call:
+        #   - Load modules used in this database (u64)
+        #   - Number of load modules listed in this section (u32)
+        #   - Size of a Load Module Specification, currently 16 (u16)
+        (
+            self.load_modules_pointer,
+            num_load_modules,
+            self.load_module_size,
+        ) = _META_ARRAY_SECTION.unpack_from(self.mm, section_pointer)
 
         # Going to store file's path in self.load_modules_list.
-        # Each will contain the index of file's path string in
+        # Each entry is the index of file's path string in
         # self.common_string
-        self.load_modules_list: list[dict] = []
-
-        for i in range(num_load_modules):
-            current_index = self.load_modules_pointer + (i * self.load_module_size)
-            self.file.seek(current_index)
-
-            # Flags -- Reserved for future use (u32)
-            # flags = int.from_bytes(
-            #     self.file.read(4), byteorder=self.byte_order, signed=self.signed
-            # )
-            self.file.read(4)
-            # empty space that we need to skip
-            self.file.read(4)
-            # Full path to the associated application binary
-            path_pointer = int.from_bytes(
-                self.file.read(8), byteorder=self.byte_order, signed=self.signed
-            )
-            module_map = {"string_index": self.common_string_index_map[path_pointer]}
-            self.load_modules_list.append(module_map)
+        # The specifications are stored contiguously, so all of them are
+        # viewed as one array. Flags -- Reserved for future use (u32) and
+        # empty space are skipped, leaving the full path to the associated
+        # application binary.
+        load_modules = np.frombuffer(
+            self.mm,
+            dtype=_path_specification_dtype(self.load_module_size),
+            count=num_load_modules,
+            offset=self.load_modules_pointer,
+        )
+        self.load_modules_list: list[int] = self.__get_common_string_indices(
+            load_modules["path_pointer"]
+        )
 
     def __read_string(self, file_pointer: int) -> str:
         """
         Helper function to read a string from the file starting at the file_pointer
         and ending at the first occurence of the null character
         """
-        self.file.seek(file_pointer)
-        name = ""
-        while True:
-            read = str(self.file.read(1), encoding="UTF-8")
-            if read == "\0":
-                break
-            name += read
-        return name
+        end = self.mm.find(b"\0", file_pointer)
+        if end == -1:
+            end = len(self.mm)
+        return self.mm[file_pointer:end].decode("UTF-8")
 
     def get_identifier_name(self, kind: int):
         """
@@ -359,24 +510,18 @@ class MetaReader:
         Reads "Identifier Names" Section and Identifier Name strings in self.names_list
         """
 
-        # go to correct section of file
-        self.file.seek(section_pointer)
-
-        # Human-readable names for Identifier kinds
-        names_pointer_pointer = int.from_bytes(
-            self.file.read(8), byteorder=self.byte_order, signed=self.signed
-        )
-        # Number of names listed in this section
-        num_names = int.from_bytes(
-            self.file.read(1), byteorder=self.byte_order, signed=self.signed
+        # The section header is unpacked in one call:
+        #   - Human-readable names for Identifier kinds (u64)
+        #   - Number of names listed in this section (u8)
+        names_pointer_pointer, num_names = _META_IDENTIFIER_NAMES_SECTION.unpack_from(
+            self.mm, section_pointer
         )
 
         self.identifier_names: list[str] = []
 
         for i in range(num_names):
-            self.file.seek(names_pointer_pointer + (i * 8))
-            names_pointer = int.from_bytes(
-                self.file.read(8), byteorder=self.byte_order, signed=self.signed
+            (names_pointer,) = _META_FLEX_WORD.unpack_from(
+                self.mm, names_pointer_pointer + (i * 8)
             )
             self.identifier_names.append(self.__read_string(names_pointer))
 
@@ -399,49 +544,35 @@ class MetaReader:
         Reads the "Functions" section of meta.db.
         """
 
-        # go to correct section in file
-        self.file.seek(section_pointer)
-
-        self.functions_array_pointer = int.from_bytes(
-            self.file.read(8), byteorder=self.byte_order, signed=self.signed
-        )
-        num_functions = int.from_bytes(
-            self.file.read(4), byteorder=self.byte_order, signed=self.signed
-        )
-        self.function_size = int.from_bytes(
-            self.file.read(2), byteorder=self.byte_order, signed=self.signed
-        )
+        # The section header is unpacked in one call:
+        #   - Functions used in this database (u64)
+        #   - Number of functions listed in this section (u32)
+        #   - Size of a Function Specification, currently 40 (u16)
+        (
+            self.functions_array_pointer,
+            num_functions,
+            self.function_size,
+        ) = _META_ARRAY_SECTION.unpack_from(self.mm, section_pointer)
 
         self.functions_list: list[dict] = []
         for i in range(num_functions):
             current_index = self.functions_array_pointer + (i * self.function_size)
-            self.file.seek(current_index)
-            function_name_pointer = int.from_bytes(
-                self.file.read(8), byteorder=self.byte_order, signed=self.signed
-            )
-            modules_pointer = int.from_bytes(
-                self.file.read(8), byteorder=self.byte_order, signed=self.signed
-            )
-            modules_offset = int.from_bytes(
-                self.file.read(8), byteorder=self.byte_order, signed=self.signed
-            )
-            file_pointer = int.from_bytes(
-                self.file.read(8), byteorder=self.byte_order, signed=self.signed
-            )
-            source_line = int.from_bytes(
-                self.file.read(4), byteorder=self.byte_order, signed=self.signed
-            )
-            # flags = int.from_bytes(
-            #     self.file.read(4), byteorder=self.byte_order, signed=self.signed
-            # )
-            self.file.read(4)
+            # The whole function specification is unpacked in one call (the
+            # flags are skipped)
+            (
+                function_name_pointer,
+                modules_pointer,
+                modules_offset,
+                file_pointer,
+                source_line,
+            ) = _META_FUNCTION_SPECIFICATION.unpack_from(self.mm, current_index)
             source_file_index = None
             load_module_index = None
             function_name_index = None
             if function_name_pointer != 0:
-                function_name_index = self.common_string_index_map[
+                function_name_index = self.__get_common_string_index(
                     function_name_pointer
-                ]
+                )
             if modules_pointer != 0:
                 load_module_index = self.__get_load_modules_index(modules_pointer)
                 # currently ignoring offset -- no idea how that's used
@@ -475,49 +606,34 @@ class MetaReader:
         Reads the "Source Files" Section of meta.db.
         """
 
-        self.file.seek(section_pointer)
-
-        # Source files used in this database
-        self.source_files_pointer = int.from_bytes(
-            self.file.read(8), byteorder=self.byte_order, signed=self.signed
-        )
-
-        # Number of source files listed in this section (u32)
-        num_files = int.from_bytes(
-            self.file.read(4), byteorder=self.byte_order, signed=self.signed
-        )
-
-        # Size of a Source File Specification, currently 16 (u16)
-        self.source_file_size = int.from_bytes(
-            self.file.read(2), byteorder=self.byte_order, signed=self.signed
-        )
-
-        # Looping through individual files to get there information now
-        self.file.seek(self.source_files_pointer)
+        # The section header is unpacked in one call:
+        #   - Source files used in this database (u64)
+        #   - Number of source files listed in this section (u32)
+        #   - Size of a Source File Specification, currently 16 (u16)
+        (
+            self.source_files_pointer,
+            num_files,
+            self.source_file_size,
+        ) = _META_ARRAY_SECTION.unpack_from(self.mm, section_pointer)
 
         # Going to store file's path in self.files_list.
-        # Each will contain the index of file's path string in
+        # Each entry is the index of file's path string in
         # self.common_string
-        self.source_files_list: list[dict] = []
-        for i in range(num_files):
-            # Reading information about each individual source file
-            self.file.seek(self.source_files_pointer + (i * self.source_file_size))
-
-            # flag = int.from_bytes(
-            #     self.file.read(4), byteorder=self.byte_order, signed=self.signed
-            # )
-            self.file.read(4)
-            # empty space that we need to skip
-            self.file.read(4)
-            # Path to the source file. Absolute, or relative to the root database
-            # directory. The string pointed to by pPath is completely within the
-            # Common String Table section, including the terminating NUL byte.
-            file_path_pointer = int.from_bytes(
-                self.file.read(8), byteorder=self.byte_order, signed=self.signed
-            )
-            string_index = self.common_string_index_map[file_path_pointer]
-            source_file_map = {"string_index": string_index}
-            self.source_files_list.append(source_file_map)
+        # The specifications are stored contiguously, so all of them are
+        # viewed as one array, and their paths are looked up in one go.
+        # The flags and empty space are skipped, leaving the path to the
+        # source file. Absolute, or relative to the root database
+        # directory. The string pointed to by pPath is completely within the
+        # Common String Table section, including the terminating NUL byte.
+        source_files = np.frombuffer(
+            self.mm,
+            dtype=_path_specification_dtype(self.source_file_size),
+            count=num_files,
+            offset=self.source_files_pointer,
+        )
+        self.source_files_list: list[int] = self.__get_common_string_indices(
+            source_files["path_pointer"]
+        )
 
     def __read_context_tree_section(
         self, section_pointer: int, section_size: int
@@ -529,31 +645,67 @@ class MetaReader:
         the correct entry and add it to the CCT.
         """
 
-        self.cct = Graph()
         self.context_map: dict[int, dict] = {}
 
         # Reading "Context Tree" section header
 
-        # make sure we're in the right spot of the file
-        self.file.seek(section_pointer)
-
-        # ({Entry}[nEntryPoints]*)
-        entry_points_array_pointer = int.from_bytes(
-            self.file.read(8), byteorder=self.byte_order, signed=self.signed
-        )
-        # (u16)
-        num_entry_points = int.from_bytes(
-            self.file.read(2), byteorder=self.byte_order, signed=self.signed
-        )
-        # (u8)
-        entry_point_size = int.from_bytes(
-            self.file.read(1), byteorder=self.byte_order, signed=self.signed
-        )
+        # The section header is unpacked in one call:
+        #   - ({Entry}[nEntryPoints]*) (u64)
+        #   - number of entry points (u16)
+        #   - size of an entry point (u8)
+        (
+            entry_points_array_pointer,
+            num_entry_points,
+            entry_point_size,
+        ) = _META_CONTEXT_TREE_SECTION.unpack_from(self.mm, section_pointer)
+
+        # The walk below chases pointers all over the context tree section,
+        # and every first touch of a page would otherwise block on its own
+        # read. All the contexts are stored inside the section, so ask the
+        # kernel to read the whole section in up front (asynchronously, in
+        # as few and as large reads as it sees fit) while the walk starts.
+        if hasattr(self.mm, "madvise") and hasattr(mmap, "MADV_WILLNEED"):
+            # the start has to be aligned to a page
+            page_start = section_pointer - section_pointer % mmap.PAGESIZE
+            section_end = min(section_pointer + section_size, len(self.mm))
+            if section_end > page_start:
+                self.mm.madvise(
+                    mmap.MADV_WILLNEED, page_start, section_end - page_start
+                )
 
         for i in range(num_entry_points):
             current_pointer = entry_points_array_pointer + (i * entry_point_size)
             self.__read_single_entry_point(current_pointer)
 
+        # trim the flat node arrays to the number of nodes actually read
+        self.node_parent = self.node_parent[: self.current_nid]
+        self.node_level = self.node_level[: self.current_nid]
+
+        self.__create_cct()
+
+    def __create_cct(self) -> None:
+        """
+        Creates the Node objects of the CCT from the flat node arrays.
+
+        Nodes are numbered in the order they were read, so a parent always
+        has a smaller nid than its children and is created before them.
+        """
+
+        self.cct = Graph()
+        self.nodes: list[Node] = []
+
+        for nid, (parent_nid, level) in enumerate(
+            zip(self.node_parent.tolist(), self.node_level.tolist())
+        ):
+            if parent_nid == -1:
+                node = Node(nid, None, level)
+                self.cct.add_root(node)
+            else:
+                parent_node = self.nodes[parent_nid]
+                node = Node(nid, parent_node, level)
+                parent_node.add_child(node)
+            self.nodes.append(node)
+
     def __read_single_entry_point(self, entry_point_pointer: int) -> None:
         """
         Reads single (root) context entry.
@@ -561,36 +713,22 @@ class MetaReader:
         Reads the correct entry and adds it to the CCT.
         """
 
-        self.file.seek(entry_point_pointer)
-
-        # Reading information about child contexts
-        # Total size of *pChildren (I call pChildren children_pointer), in bytes (u64)
-        children_size = int.from_bytes(
-            self.file.read(8), byteorder=self.byte_order, signed=self.signed
-        )
-        # Pointer to the array of child contexts
-        children_pointer = int.from_bytes(
-            self.file.read(8), byteorder=self.byte_order, signed=self.signed
-        )
-
-        # Reading information about this context
-        # Unique identifier for this context (u32)
-        context_id = int.from_bytes(
-            self.file.read(4), byteorder=self.byte_order, signed=self.signed
-        )
-        # Type of entry point used here (u16)
-        # entry_point_type = int.from_bytes(
-        #     self.file.read(2), byteorder=self.byte_order, signed=self.signed
-        # )
-        self.file.read(2)
-        # next 2 bytes are blank
-        self.file.read(2)
-        # Human-readable name for the entry point
-        pretty_name_pointer = int.from_bytes(
-            self.file.read(8), byteorder=self.byte_order, signed=self.signed
-        )
+        # The whole entry point is unpacked in one call:
+        #   - Total size of *pChildren (I call pChildren children_pointer), in
+        #     bytes (u64)
+        #   - Pointer to the array of child contexts (u64)
+        #   - Unique identifier for this context (u32)
+        #   - Type of entry point used here (u16), then 2 blank bytes
+        #   - Human-readable name for the entry point (u64)
+        (
+            children_size,
+            children_pointer,
+            context_id,
+            entry_point_type,
+            pretty_name_pointer,
+        ) = _META_ENTRY_POINT.unpack_from(self.mm, entry_point_pointer)
         # map context for this context
-        string_index = self.common_string_index_map[pretty_name_pointer]
+        string_index = self.__get_common_string_index(pretty_name_pointer)
         context = {
             "relation": None,
             "lexical_type": None,
@@ -601,86 +739,77 @@ class MetaReader:
             "load_module_offset": None,
             "string_index": string_index,
         }
-        # context = {"string_index": string_index}
         self.context_map[context_id] = context
-        # Create Node for this context
-        node: Node = Node(self._add_context_id(context_id), None)
-        # Adding the Node to the CCT
-        self.cct.add_root(node)
-        self.node_map[context_id] = node
+        # Adding a root node for this context
+        nid = self._add_context_id(context_id, -1)
+        self.node_map[context_id] = nid
 
         # Reading the children contexts
-        self.__read_children_contexts(children_pointer, children_size, node, context_id)
+        self.__read_children_contexts(children_pointer, children_size, nid, context_id)
 
     def __read_children_contexts(
         self,
         context_array_pointer: int,
         total_size: int,
-        parent_node: Node,
+        parent_nid: int,
         parent_context_id: int,
     ) -> None:
         """
-        Recursive function to read all child contexts and add it to the CCT
+        Reads all the contexts under the given array of child contexts (the
+        whole subtree) and adds them to the CCT
         """
 
-        if total_size <= 0 or context_array_pointer <= 0:
-            return
-        self.file.seek(context_array_pointer)
-        index = 0
-        while index < total_size:
-            # Reading information about child contexts (as in the children of
-            # this context)
-            # Total size of *pChildren (I call pChildren children_pointer),
-            # in bytes (u64)
-            children_size = int.from_bytes(
-                self.file.read(8), byteorder=self.byte_order, signed=self.signed
-            )
-            index += 8
-            # Pointer to the array of child contexts
-            children_pointer = int.from_bytes(
-                self.file.read(8), byteorder=self.byte_order, signed=self.signed
+        # Instead of recursing into the children of every context, we keep an
+        # explicit stack of context arrays that still have contexts left to
+        # read. Each entry holds the pointer to the next context to read, the
+        # end of its array, and the nid and context id of the parent.
+        # The children of a context are pushed after the rest of its array,
+        # so they are read first, and contexts (and nids) come out in the same
+        # depth-first order as a recursive walk would give.
+        stack = []
+        if total_size > 0 and context_array_pointer > 0:
+            stack.append(
+                (
+                    context_array_pointer,
+                    context_array_pointer + total_size,
+                    parent_nid,
+                    parent_context_id,
+                )
             )
-            index += 8
 
-            # Reading information about this context
-            # Unique identifier for this context (u32)
-            context_id = int.from_bytes(
-                self.file.read(4), byteorder=self.byte_order, signed=self.signed
-            )
-            index += 4
-            # Reading flags (u8)
-            flags = int.from_bytes(
-                self.file.read(1), byteorder=self.byte_order, signed=self.signed
-            )
-            index += 1
-            # Relation this context has with its parent (u8)
-            relation = int.from_bytes(
-                self.file.read(1), byteorder=self.byte_order, signed=self.signed
-            )
-            index += 1
-            # Type of lexical context represented (u8)
-            lexical_type = int.from_bytes(
-                self.file.read(1), byteorder=self.byte_order, signed=self.signed
-            )
-            index += 1
-            # Size of flex, in u8[8] "words" (bytes / 8) (u8)
-            num_flex_words = int.from_bytes(
-                self.file.read(1), byteorder=self.byte_order, signed=self.signed
-            )
-            index += 1
-            # Bitmask for defining propagation scopes (u16)
-            # propogation = int.from_bytes(
-            #     self.file.read(2), byteorder=self.byte_order, signed=self.signed
-            # )
-            self.file.read(2)
-            index += 2
-            # Empty space
-            self.file.read(6)
-            index += 6
-
-            # reading flex
-            flex = self.file.read(8 * num_flex_words)
-            index += 8 * num_flex_words
+        while stack:
+            context_pointer, end_pointer, parent_nid, parent_context_id = stack.pop()
+
+            # The fixed part of the context is unpacked in one call:
+            #   - Total size of *pChildren (I call pChildren children_pointer),
+            #     in bytes (u64)
+            #   - Pointer to the array of child contexts (u64)
+            #   - Unique identifier for this context (u32)
+            #   - flags (u8)
+            #   - Relation this context has with its parent (u8)
+            #   - Type of lexical context represented (u8)
+            #   - Size of flex, in u8[8] "words" (bytes / 8) (u8)
+            #   - Bitmask for defining propagation scopes (u16)
+            #   - Empty space
+            (
+                children_size,
+                children_pointer,
+                context_id,
+                flags,
+                relation,
+                lexical_type,
+                num_flex_words,
+                propagation,
+            ) = _META_CONTEXT.unpack_from(self.mm, context_pointer)
+
+            # the rest of this array, if there is any, is read after the
+            # children of this context
+            next_pointer = context_pointer + _META_CONTEXT.size + 8 * num_flex_words
+            if next_pointer < end_pointer:
+                stack.append((next_pointer, end_pointer, parent_nid, parent_context_id))
+
+            # the flex words follow right after the fixed part
+            flex_pointer = context_pointer + _META_CONTEXT.size
 
             function_index: int = None
             source_file_index: int = None
@@ -694,23 +823,17 @@ class MetaReader:
             # Bit 0: hasFunction. If 1, the following sub-fields of flex are present:
             #   flex[0]: FS* pFunction: Function associated with this context
             if flags & 1 != 0:
-                sub_flex = int.from_bytes(
-                    flex[0:8], byteorder=self.byte_order, signed=self.signed
-                )
-                flex = flex[8:]
+                (sub_flex,) = _META_FLEX_WORD.unpack_from(self.mm, flex_pointer)
+                flex_pointer += 8
                 function_index = self.__get_function_index(sub_flex)
 
             # Bit 1: hasSrcLoc. If 1, the following sub-fields of flex are present:
             #   flex[1]: SFS* pFile: Source file associated with this context
             #   flex[2]: u32 line: Associated source line in pFile
             if flags & 2 != 0:
-                sub_flex_1 = int.from_bytes(
-                    flex[0:8], byteorder=self.byte_order, signed=self.signed
-                )
-                sub_flex_2 = int.from_bytes(
-                    flex[8:10], byteorder=self.byte_order, signed=self.signed
-                )
-                flex = flex[16:]
+                (sub_flex_1,) = _META_FLEX_WORD.unpack_from(self.mm, flex_pointer)
+                (sub_flex_2,) = _META_FLEX_LINE.unpack_from(self.mm, flex_pointer + 8)
+                flex_pointer += 16
                 source_file_index = self.__get_source_file_index(sub_flex_1)
                 source_file_line = sub_flex_2
 
@@ -718,13 +841,9 @@ class MetaReader:
             #   flex[3]: LMS* pModule: Load module associated with this context
             #   flex[4]: u64 offset: Associated byte offset in *pModule
             if flags & 4 != 0:
-                sub_flex_1 = int.from_bytes(
-                    flex[0:8], byteorder=self.byte_order, signed=self.signed
-                )
-                sub_flex_2 = int.from_bytes(
-                    flex[8:16], byteorder=self.byte_order, signed=self.signed
-                )
-                flex = flex[16:]
+                (sub_flex_1,) = _META_FLEX_WORD.unpack_from(self.mm, flex_pointer)
+                (sub_flex_2,) = _META_FLEX_WORD.unpack_from(self.mm, flex_pointer + 8)
+                flex_pointer += 16
                 load_module_index = self.__get_load_modules_index(sub_flex_1)
                 load_module_offset = sub_flex_2
 
@@ -732,19 +851,14 @@ class MetaReader:
             if lexical_type == 2 or lexical_type == 3:
                 # source line type or single line instruction
                 # meaning we don't want to create a node for this
-                self.node_map[context_id] = parent_node
-                next_parent_node = parent_node
+                self.node_map[context_id] = parent_nid
+                next_parent_nid = parent_nid
 
             else:
                 # otherwise we do want to create a node
-                # Creating Node for this context
-                node = Node(self._add_context_id(context_id), parent_node)
-
-                # Connecting this node to the parent node
-                parent_node.add_child(node)
-
-                # Adding this node to the graph
-                self.node_map[context_id] = node
+                # Adding a node for this context under the parent node
+                nid = self._add_context_id(context_id, parent_nid)
+                self.node_map[context_id] = nid
 
                 if lexical_type == 0:
                     # function call
@@ -777,7 +891,7 @@ class MetaReader:
                             load_module_offset = parent_information[
                                 "load_module_offset"
                             ]
-                next_parent_node = node
+                next_parent_nid = nid
 
             # creating a map for this context
             context = {
@@ -792,12 +906,16 @@ class MetaReader:
 
             self.context_map[context_id] = context
 
-            # recursively call this function to add more children
-            return_address = self.file.tell()
-            self.__read_children_contexts(
-                children_pointer, children_size, next_parent_node, context_id
-            )
-            self.file.seek(return_address)
+            # the children of this context are read next
+            if children_size > 0 and children_pointer > 0:
+                stack.append(
+                    (
+                        children_pointer,
+                        children_pointer + children_size,
+                        next_parent_nid,
+                        context_id,
+                    )
+                )
 
 
 class ProfileReader:
@@ -808,12 +926,12 @@ class ProfileReader:
         self.meta_reader: MetaReader = meta_reader
 
         # open the file to ready in binary mode (rb)
-        self.file = open(file_location, "rb")
+        self.file = _open_db_file(file_location)
 
-        # setting necessary read options
-        self.byte_order = "little"
-        self.signed = False
-        self.encoding = "ASCII"
+        # The sections are read by random access, so map the whole file into
+        # memory and unpack records straight out of it, instead of issuing a
+        # seek and a read for every field
+        self.mm = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
 
         # The profile.db header consists of the common .db header and n sections.
         # We're going to do a little set up work, so that's easy to change if
@@ -870,35 +988,23 @@ class ProfileReader:
         Reads Profile Information section.
         """
 
-        self.file.seek(section_pointer)
-
-        # Description for each profile (u64)
-        profiles_pointer = int.from_bytes(
-            self.file.read(8), byteorder=self.byte_order, signed=self.signed
-        )
-        # Number of profiles listed in this section (u32)
-        num_profiles = int.from_bytes(
-            self.file.read(4), byteorder=self.byte_order, signed=self.signed
-        )
-        # Size of a {PI} structure, currently 40 (u8)
-        profile_size = int.from_bytes(
-            self.file.read(1), byteorder=self.byte_order, signed=self.signed
+        # The section header is unpacked in one call:
+        #   - Description for each profile (u64)
+        #   - Number of profiles listed in this section (u32)
+        #   - Size of a {PI} structure, currently 40 (u8)
+        profiles_pointer, num_profiles, profile_size = _PROFILES_SECTION.unpack_from(
+            self.mm, section_pointer
         )
 
         self.profile_info_list = []
 
         for i in range(num_profiles):
-            file_index = profiles_pointer + (i * profile_size)
-            self.file.seek(file_index)
-            # Header for the values for this profile
-            psvb = self.file.read(0x20)
-            # Identifier tuple for this profile
-            hit_pointer = int.from_bytes(
-                self.file.read(8), byteorder=self.byte_order, signed=self.signed
-            )
-            # (u32)
-            flags = int.from_bytes(
-                self.file.read(4), byteorder=self.byte_order, signed=self.signed
+            # Each profile is unpacked in one call:
+            #   - Header for the values for this profile
+            #   - Identifier tuple for this profile (u64)
+            #   - flags (u32)
+            psvb, hit_pointer, flags = _PROFILE_INFO.unpack_from(
+                self.mm, profiles_pointer + (i * profile_size)
             )
             profile_map = {"hit_pointer": hit_pointer, "flags": flags, "psvb": psvb}
             self.profile_info_list.append(profile_map)
@@ -906,66 +1012,68 @@ class ProfileReader:
                 # this is a summary profile
                 self.summary_profile_index = i
 
-    def get_hit_from_profile(self, index: int) -> list:
+    def get_hit_from_profile(self, index: int) -> dict:
         profile = self.profile_info_list[index]
         hit_pointer = profile["hit_pointer"]
-        if hit_pointer != 0:
-            return self.hit_map[hit_pointer]
-        else:
+        if hit_pointer == 0:
             profile = self.profile_info_list[self.summary_profile_index]
             hit_pointer = profile["hit_pointer"]
-            return self.hit_map[hit_pointer]
+
+        # Every hit is decoded only once, the first time a profile asks for it
+        if hit_pointer not in self.hit_map:
+            self.hit_map[hit_pointer] = self.__read_hit(hit_pointer)
+        return self.hit_map[hit_pointer]
 
     def __read_hit_section(self, section_pointer: int, section_size: int) -> None:
         """
         Reads Hierarchical Identifier Tuples section of profile.db
         """
-        # let's get to the correct spot in the file
-        self.file.seek(section_pointer)
-
+        # The tuples are only referenced through the pointers in the Profiles
+        # Information section, so rather than decoding every one of them up
+        # front, we remember where the section is and decode (and cache) each
+        # tuple on demand in get_hit_from_profile.
+        self.hit_section_pointer = section_pointer
+        self.hit_section_size = section_size
         self.hit_map = {}
 
-        while (self.file.tell() - section_pointer) < section_size:
-            # hit pointer
-            hit_pointer = self.file.tell()
-
-            # Number of identifications in this tuple (u16)
-            num_tuples = int.from_bytes(
-                self.file.read(2), byteorder=self.byte_order, signed=self.signed
+    def __read_hit(self, hit_pointer: int) -> dict:
+        """
+        Reads the Hierarchical Identifier Tuple at the given pointer
+        """
+        assert (
+            0 <= hit_pointer - self.hit_section_pointer < self.hit_section_size
+        ), "identifier tuple outside of the Hierarchical Identifier Tuples section"
+
+        # Number of identifications in this tuple (u16), then empty space
+        (num_tuples,) = _HIT_HEADER.unpack_from(self.mm, hit_pointer)
+
+        # Identifications for an application thread
+        # Read H.I.T.s
+        # All identifications are viewed as one array. Each of them consists
+        # of:
+        #   - kind: One of the values listed in the profile.db
+        #     Identifier Names section. (u8)
+        #   - flags (u16)
+        #   - logical_id: Logical identifier value, may be arbitrary but
+        #     dense towards 0. (u32)
+        #   - physical_id: Physical identifier value, eg. hostid or PCI
+        #     bus index. (u64)
+        identifications = np.frombuffer(
+            self.mm,
+            dtype=_HIT_IDENTIFIER,
+            count=num_tuples,
+            offset=hit_pointer + _HIT_HEADER.size,
+        )
+        identifier_names = self.meta_reader.identifier_names
+        tuples_map = {
+            identifier_names[kind]: physical_id
+            for kind, physical_id in zip(
+                identifications["kind"].tolist(),
+                identifications["physical_id"].tolist(),
             )
+        }
 
-            # empty space
-            self.file.read(6)
-
-            # Identifications for an application thread
-            # Read H.I.T.s
-            tuples_map = {}
-            for i in range(num_tuples):
-                # One of the values listed in the profile.db
-                # Identifier Names section. (u8)
-                kind = int.from_bytes(
-                    self.file.read(1), byteorder=self.byte_order, signed=self.signed
-                )
-                # empty space
-                self.file.read(1)
-                # flag
-                # flags = int.from_bytes(
-                #     self.file.read(2), byteorder=self.byte_order, signed=self.signed
-                # )
-                self.file.read(2)
-                # Logical identifier value, may be arbitrary but dense towards 0. (u32)
-                # logical_id = int.from_bytes(
-                #     self.file.read(4), byteorder=self.byte_order, signed=self.signed
-                # )
-                self.file.read(4)
-                # Physical identifier value, eg. hostid or PCI bus index. (u64)
-                physical_id = int.from_bytes(
-                    self.file.read(8), byteorder=self.byte_order, signed=self.signed
-                )
-                identifier_name = self.meta_reader.get_identifier_name(kind)
-                tuples_map[identifier_name] = physical_id
-
-            self.hit_map[hit_pointer] = self.__clean_hit(tuples_map)
+        return self.__clean_hit(tuples_map)
 
     def __clean_hit(self, tuples_map: dict) -> dict:
         # add None for information not present
@@ -985,55 +1093,302 @@ class ProfileReader:
         """
 
         # read Magic identifier ("HPCPROF-tracedb_")
-        # first ten buyes are HPCTOOLKIT in ASCII
-        identifier = str(self.file.read(10), encoding=self.encoding)
-        assert identifier == "HPCTOOLKIT"
+        # first ten bytes are HPCTOOLKIT in ASCII, which we compare as bytes
+        # (there is no need to decode them just to compare them)
+        assert self.mm[0:10] == b"HPCTOOLKIT"
 
         # next 4 bytes (u8) are the "Specific format identifier"
-        format_identifier = str(self.file.read(4), encoding=self.encoding)
-        assert format_identifier == "prof"
+        assert self.mm[10:14] == b"prof"
 
-        # next byte (u8) contains the "Common major version, currently 4"
-        self.major_version = int.from_bytes(
-            self.file.read(1), byteorder=self.byte_order, signed=self.signed
-        )
-        # next byte (u8) contains the "Specific minor version"
-        self.minor_version = int.from_bytes(
-            self.file.read(1), byteorder=self.byte_order, signed=self.signed
-        )
+        # next 2 bytes (u8 each) contain the "Common major version, currently
+        # 4" and the "Specific minor version", followed by the section table
+        (
+            self.major_version,
+            self.minor_version,
+            self.section_size,
+            self.section_pointer,
+        ) = _unpack_common_header(self.mm, len(self.read_order))
 
-        self.section_pointer = []
-        self.section_size = []
-        # In the header each section is given 16 bytes:
-        #   - First 8 bytes specify the total size of the section (in bytes)
-        #   - Last 8 bytes specify a pointer to the beggining of the section
-        for i in range(len(self.read_order)):
-            self.section_size.append(
-                int.from_bytes(
-                    self.file.read(8), byteorder=self.byte_order, signed=self.signed
-                )
-            )
-            self.section_pointer.append(
-                int.from_bytes(
-                    self.file.read(8), byteorder=self.byte_order, signed=self.signed
-                )
+
+class _TraceEvents:
+    """
+    The Enter/Leave events of a trace line, stored as one array per field
+    (the timestamp, the nid of the node, and whether it is a Leave event)
+    """
+
+    # these are created for every trace line, and sent back from the worker
+    # processes, so keep them as small as possible
+    __slots__ = ("timestamps", "nids", "leaves")
+
+    def __init__(
+        self, timestamps: np.ndarray, nids: np.ndarray, leaves: np.ndarray
+    ) -> None:
+        self.timestamps = timestamps
+        self.nids = nids
+        self.leaves = leaves
+
+    def __len__(self) -> int:
+        return len(self.nids)
+
+    @staticmethod
+    def concatenate(events_list: list) -> "_TraceEvents":
+        """Puts the events of several trace lines one after the other"""
+        if len(events_list) == 0:
+            # a trace.db without any trace lines has no events
+            return _TraceEvents(
+                np.empty(0, dtype=np.int64),
+                np.empty(0, dtype=np.int32),
+                np.empty(0, dtype=np.bool_),
             )
+        return _TraceEvents(
+            np.concatenate([events.timestamps for events in events_list]),
+            np.concatenate([events.nids for events in events_list]),
+            np.concatenate([events.leaves for events in events_list]),
+        )
+
+
+def _node_minima(node_parent: np.ndarray, node_level: np.ndarray) -> np.ndarray:
+    """
+    Builds a sparse table over the nodes of the CCT, for finding least common
+    ancestors in constant time: row k holds, for every nid i, the node of the
+    lowest level among the nids i to i + 2^k - 1.
+
+    This relies on the nids being numbered in preorder (as MetaReader does).
+    Then the least common ancestor of two different nodes a < b is the parent
+    of the lowest level node among the nids a + 1 to b, which are exactly the
+    nodes the depth-first walk passes through from a to b.
+
+    node_parent and node_level have an extra entry at the end, for nid -1 (no
+    node), which is its own parent and has a level of -1.
+    """
+    num_nodes = len(node_parent) - 1
+    minima = [np.append(np.arange(num_nodes, dtype=np.int32), -1)]
+    width = 1
+    while 2 * width <= num_nodes:
+        # the minimum over 2 * width nids is the lower of the minima over the
+        # two halves (the last few entries of a row are never looked up)
+        previous = minima[-1]
+        left = previous[: len(previous) - width]
+        right = previous[width:]
+        row = previous.copy()
+        row[: len(left)] = np.where(node_level[left] <= node_level[right], left, right)
+        minima.append(row)
+        width *= 2
+    return np.stack(minima)
+
+
+def _read_trace_line(
+    mm: mmap.mmap,
+    start_pointer: int,
+    end_pointer: int,
+    min_time_stamp: int,
+    max_time_stamp: int,
+    node_parent: np.ndarray,
+    node_level: np.ndarray,
+    node_minima: np.ndarray,
+    context_nid: np.ndarray,
+) -> _TraceEvents:
+    """
+    Reads all trace elements of a single trace line and turns the samples into
+    Enter/Leave events.
+
+    node_parent and node_level have an extra entry at the end, for nid -1 (no
+    node), which is its own parent and has a level of -1. node_minima is the
+    sparse table built by _node_minima.
+    """
+
+    # View the whole trace line straight out of the mapped file, instead
+    # of seeking and reading every element separately, as an array of
+    # elements. Each element consists of:
+    #   - Timestamp (nanoseconds since epoch)
+    #   - Sample calling context id (in meta.db)
+    #     can use this to get name of function from meta.db
+    #     Procedure tab
+    trace_line = np.frombuffer(
+        mm,
+        dtype=_TRACE_ELEMENT,
+        count=(end_pointer - start_pointer) // _TRACE_ELEMENT.itemsize,
+        offset=start_pointer,
+    )
+
+    # Consecutive samples usually stay in the same context, and nothing
+    # changes between them. So we only keep the samples where the
+    # context id differs from the previous sample (and the first sample).
+    # The context ids are compared as they are stored (u32), without
+    # decoding them into a new array first.
+    context_ids = trace_line["context_id"]
+    changes = np.empty(len(context_ids), dtype=np.bool_)
+    changes[:1] = True
+    np.not_equal(context_ids[1:], context_ids[:-1], out=changes[1:])
+
+    # Only the timestamps of the kept samples are decoded, and they are made
+    # relative to the smallest timestamp of the trace in place
+    timestamps = trace_line["timestamp"][changes].astype(np.int64)
+    timestamps -= min_time_stamp
+
+    # the node of each sample, or -1 if the process is idling (context id 0)
+    nids = context_nid[context_ids[changes]]
+
+    # Instead of walking the CCT from one sample to the next in Python, we
+    # handle all the transitions between consecutive samples at once. Every
+    # transition goes from the last node to the current node (either of
+    # which can be -1), and at the end of the trace we go back to no node.
+    last_nids = np.concatenate(([-1], nids))
+    current_nids = np.concatenate((nids, [-1]))
+    timestamps = np.concatenate((timestamps, [max_time_stamp - min_time_stamp]))
+
+    # The least common ancestor of the last and current node, for every
+    # transition at once, in constant time: the parent of the lowest node
+    # between them in preorder, which is looked up in the sparse table as the
+    # lower of the minima of two (overlapping) power of two ranges. If either
+    # node is -1, or both are the same node, the smaller one is the answer.
+    low_nids = np.minimum(last_nids, current_nids)
+    high_nids = np.maximum(last_nids, current_nids)
+    queries = (low_nids >= 0) & (low_nids != high_nids)
+    range_starts = np.where(queries, low_nids + 1, 0)
+    range_ends = np.where(queries, high_nids, 0)
+    rows = np.frexp(range_ends - range_starts + 1)[1] - 1
+    first_minima = node_minima[rows, range_starts]
+    second_minima = node_minima[rows, range_ends - (1 << rows) + 1]
+    minima = np.where(
+        node_level[first_minima] <= node_level[second_minima],
+        first_minima,
+        second_minima,
+    )
+    common_nids = np.where(queries, node_parent[minima], low_nids)
+
+    # First we want to close all the "enter" events from the last node that
+    # aren't still running, then add all the new "enter" events after the
+    # common node. So every transition has a Leave event for every level
+    # between the last node and the common node, followed by an Enter event
+    # for every level between the common node and the current node.
+    common_levels = node_level[common_nids]
+    num_leaves = node_level[last_nids] - common_levels
+    num_enters = node_level[current_nids] - common_levels
+    num_events = num_leaves + num_enters
+    event_starts = np.cumsum(num_events) - num_events
+
+    # The exact number of events is known now, so the output arrays can be
+    # allocated once. The first num_leaves events of every transition are its
+    # Leave events.
+    event_timestamps = np.repeat(timestamps, num_events)
+    event_nids = np.empty(len(event_timestamps), dtype=np.int32)
+    event_leaves = np.arange(len(event_timestamps)) - np.repeat(
+        event_starts, num_events
+    ) < np.repeat(num_leaves, num_events)
+
+    # The i-th Leave event of a transition is for the i-th ancestor of the
+    # last node, so we fill in all the i-th Leave events at once, for every
+    # transition that still has one. The position, node and number of
+    # remaining events of those transitions are carried from one level to the
+    # next, so every level only touches the transitions that are still going.
+    transitions = np.flatnonzero(num_leaves)
+    positions = event_starts[transitions]
+    ancestors = last_nids[transitions]
+    remaining = num_leaves[transitions]
+    while len(positions):
+        event_nids[positions] = ancestors
+        remaining = remaining - 1
+        going = remaining > 0
+        positions = positions[going] + 1
+        ancestors = node_parent[ancestors[going]]
+        remaining = remaining[going]
+
+    # The Enter events are ordered from the top down, so the current node
+    # goes in the last position of the transition and the i-th ancestor of
+    # the current node goes i positions before it. That way the walk up the
+    # ancestors fills in the Enter events from the back, without reversing
+    # anything.
+    transitions = np.flatnonzero(num_enters)
+    positions = event_starts[transitions] + num_events[transitions] - 1
+    ancestors = current_nids[transitions]
+    remaining = num_enters[transitions]
+    while len(positions):
+        event_nids[positions] = ancestors
+        remaining = remaining - 1
+        going = remaining > 0
+        positions = positions[going] - 1
+        ancestors = node_parent[ancestors[going]]
+        remaining = remaining[going]
+
+    return _TraceEvents(event_timestamps, event_nids, event_leaves)
+
+
+# The timestamp range and CCT tables that every trace line is read with. They
+# are the same for every chunk of trace lines, and the tables can be large, so
+# they are handed to each process once, by _init_trace_worker, instead of being
+# sent along with every chunk.
+_trace_tables = {}
+
+
+def _init_trace_worker(
+    min_time_stamp: int,
+    max_time_stamp: int,
+    node_parent: np.ndarray,
+    node_level: np.ndarray,
+    node_minima: np.ndarray,
+    context_nid: np.ndarray,
+) -> None:
+    """
+    Sets up the tables _read_trace_lines reads with, in the process that is
+    going to call it. Used as the initializer of multiprocessing.Pool
+    """
+    _trace_tables.update(
+        min_time_stamp=min_time_stamp,
+        max_time_stamp=max_time_stamp,
+        node_parent=node_parent,
+        node_level=node_level,
+        node_minima=node_minima,
+        context_nid=context_nid,
+    )
+
+
+def _read_trace_lines(args: tuple) -> list:
+    """
+    Reads a chunk of trace lines from trace.db. Takes a single tuple of
+    arguments, so it can be used with multiprocessing.Pool.map, and the
+    tables set up by _init_trace_worker
+    """
+    file_location, trace_lines = args
+
+    with _open_db_file(file_location) as file, mmap.mmap(
+        file.fileno(), 0, access=mmap.ACCESS_READ
+    ) as mm:
+        # We already know every region of the file this chunk is going to
+        # read, so tell the kernel about all of them up front. It can then
+        # read them in ahead of time (asynchronously, and batched as it sees
+        # fit) while we decode the first trace lines.
+        if hasattr(mm, "madvise") and hasattr(mmap, "MADV_WILLNEED"):
+            for start_pointer, end_pointer in trace_lines:
+                # the start has to be aligned to a page
+                page_start = start_pointer - start_pointer % mmap.PAGESIZE
+                if end_pointer > page_start:
+                    mm.madvise(mmap.MADV_WILLNEED, page_start, end_pointer - page_start)
+
+        return [
+            _read_trace_line(mm, start_pointer, end_pointer, **_trace_tables)
+            for start_pointer, end_pointer in trace_lines
+        ]
 
 
 class TraceReader:
     def __init__(
-        self, file_location: str, meta_reader: MetaReader, profile_reader: ProfileReader
+        self,
+        file_location: str,
+        meta_reader: MetaReader,
+        profile_reader: ProfileReader,
+        num_processes: int = 1,
     ) -> None:
         # open file
-        self.file = open(file_location, "rb")
+        self.file_location = file_location
+        self.num_processes = num_processes
+        self.file = _open_db_file(file_location)
+        # map the file into memory, so the trace lines can be viewed as
+        # arrays without copying them out of the file first
+        self.mm = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
         self.meta_reader = meta_reader
         self.profile_reader = profile_reader
 
-        # setting necessary read options
-        self.byte_order = "little"
-        self.signed = False
-        self.encoding = "ASCII"
-
         # The trace.db header consists of the common .db header and n sections.
         # We're going to do a little set up work, so that's easy to change if
         # any revisions change the orders.
@@ -1081,39 +1436,21 @@ class TraceReader:
         """
 
         # read Magic identifier ("HPCPROF-tracedb_")
-        # first ten buyes are HPCTOOLKIT in ASCII
-        identifier = str(self.file.read(10), encoding=self.encoding)
-        assert identifier == "HPCTOOLKIT"
+        # first ten bytes are HPCTOOLKIT in ASCII, which we compare as bytes
+        # (there is no need to decode them just to compare them)
+        assert self.mm[0:10] == b"HPCTOOLKIT"
 
         # next 4 bytes (u8) are the "Specific format identifier"
-        format_identifier = str(self.file.read(4), encoding=self.encoding)
-        assert format_identifier == "trce"
-
-        # next byte (u8) contains the "Common major version, currently 4"
-        self.major_version = int.from_bytes(
-            self.file.read(1), byteorder=self.byte_order, signed=self.signed
-        )
-        # next byte (u8) contains the "Specific minor version"
-        self.minor_version = int.from_bytes(
-            self.file.read(1), byteorder=self.byte_order, signed=self.signed
-        )
+        assert self.mm[10:14] == b"trce"
 
-        self.section_pointer = []
-        self.section_size = []
-        # In the header each section is given 16 bytes:
-        #   - First 8 bytes specify the total size of the section (in bytes)
-        #   - Last 8 bytes specify a pointer to the beggining of the section
-        for i in range(len(self.read_order)):
-            self.section_size.append(
-                int.from_bytes(
-                    self.file.read(8), byteorder=self.byte_order, signed=self.signed
-                )
-            )
-            self.section_pointer.append(
-                int.from_bytes(
-                    self.file.read(8), byteorder=self.byte_order, signed=self.signed
-                )
-            )
+        # next 2 bytes (u8 each) contain the "Common major version, currently
+        # 4" and the "Specific minor version", followed by the section table
+        (
+            self.major_version,
+            self.minor_version,
+            self.section_size,
+            self.section_pointer,
+        ) = _unpack_common_header(self.mm, len(self.read_order))
 
     def __read_trace_headers_section(
         self, section_pointer: int, section_size: int
@@ -1122,255 +1459,228 @@ class TraceReader:
         Reader Context Trace Headers section of trace.db
         """
 
-        # get to the right place in the file
-        self.file.seek(section_pointer)
-
-        # Header for each trace (u64)
-        trace_headers_pointer = int.from_bytes(
-            self.file.read(8), byteorder=self.byte_order, signed=self.signed
-        )
-        # Number of traces listed in this section (u32)
-        num_trace_headers = int.from_bytes(
-            self.file.read(4), byteorder=self.byte_order, signed=self.signed
+        # The section header is unpacked in one call:
+        #   - Header for each trace (u64)
+        #   - Number of traces listed in this section (u32)
+        #   - Size of a {TH} structure, currently 24 (u8)
+        #   - empty space
+        #   - Smallest timestamp of the traces listed in *pTraces (u64)
+        #   - Largest timestamp of the traces listed in *pTraces (u64)
+        (
+            trace_headers_pointer,
+            num_trace_headers,
+            trace_header_size,
+            self.min_time_stamp,
+            self.max_time_stamp,
+        ) = _TRACE_HEADERS_SECTION.unpack_from(self.mm, section_pointer)
+
+        # The trace headers are stored contiguously, so view all of them as
+        # one array. Each header consists of:
+        #   - Index of a profile listed in the profile.db (u32)
+        #   - Pointer to the first element of the trace line (array)
+        #   - Pointer to the after-end element of the trace line (array)
+        trace_headers = np.frombuffer(
+            self.mm,
+            dtype=_trace_header_dtype(trace_header_size),
+            count=num_trace_headers,
+            offset=trace_headers_pointer,
         )
-        # Size of a {TH} structure, currently 24
-        trace_header_size = int.from_bytes(
-            self.file.read(1), byteorder=self.byte_order, signed=self.signed
+        trace_lines = list(
+            zip(
+                trace_headers["start_pointer"].tolist(),
+                trace_headers["end_pointer"].tolist(),
+            )
         )
 
-        # empty space
-        self.file.read(3)
+        # The identifiers of a trace line are the same for every event
+        self.event_identifiers = []
+        for profile_index in trace_headers["profile_index"].tolist():
+            hit = self.profile_reader.get_hit_from_profile(profile_index)
+            self.event_identifiers.append(
+                (hit["RANK"], hit["THREAD"], hit["NODE"], hit["CORE"])
+            )
 
-        # Smallest timestamp of the traces listed in *pTraces (u64)
-        self.min_time_stamp = int.from_bytes(
-            self.file.read(8), byteorder=self.byte_order, signed=self.signed
-        )
-        # Largest timestamp of the traces listed in *pTraces (u64)
-        self.max_time_stamp = int.from_bytes(
-            self.file.read(8), byteorder=self.byte_order, signed=self.signed
+        # The flat CCT arrays, with an extra entry for nid -1 (no node) at the
+        # end, so that -1 can be used as an index like any other nid
+        node_parent = np.append(self.meta_reader.node_parent, -1)
+        node_level = np.append(self.meta_reader.node_level, -1)
+
+        # The least common ancestors are needed for every transition of every
+        # trace line, so precompute the table to look them up once
+        node_minima = _node_minima(node_parent, node_level)
+
+        # maps every context id to its nid, and context id 0 (idle) to -1
+        node_map = self.meta_reader.node_map
+        context_nid = np.full(max(node_map, default=0) + 1, -1, dtype=np.int32)
+        context_nid[list(node_map.keys())] = list(node_map.values())
+        context_nid[0] = -1
+
+        # The trace lines are independent of each other, so they can be read
+        # in parallel. Each process gets a contiguous chunk of trace lines,
+        # which keeps the events in trace header order once the chunks are
+        # put back together.
+        num_processes = max(min(self.num_processes, num_trace_headers), 1)
+        # (at least 1, as there are no trace lines to split in an empty trace)
+        chunk_size = max(-(-num_trace_headers // num_processes), 1)
+        args = [
+            (self.file_location, trace_lines[i : i + chunk_size])
+            for i in range(0, num_trace_headers, chunk_size)
+        ]
+        tables = (
+            self.min_time_stamp,
+            self.max_time_stamp,
+            node_parent,
+            node_level,
+            node_minima,
+            context_nid,
         )
+        if num_processes == 1:
+            _init_trace_worker(*tables)
+            chunks = list(map(_read_trace_lines, args))
+            # don't hold on to the tables once the trace has been read
+            _trace_tables.clear()
+        else:
+            pool = mp.Pool(
+                num_processes, initializer=_init_trace_worker, initargs=tables
+            )
+            chunks = pool.map(_read_trace_lines, args)
+            pool.close()
 
-        self.data = {
-            "Timestamp (ns)": [],
-            "Event Type": [],
-            "Name": [],
-            "Thread": [],
-            "Process": [],
-            "Core": [],
-            "Host": [],
-            "Node": [],
-            "Source File Name": [],
-            "Source File Line Number": [],
-            "Calling Context ID": [],
-        }
+        # Every trace line adds its events as a few integer arrays, and the
+        # actual columns are only built once all trace lines have been read
+        self.events = [events for chunk in chunks for events in chunk]
 
-        for i in range(num_trace_headers):
-            header_pointer = trace_headers_pointer + (i * trace_header_size)
-            self.__read_single_trace_header(header_pointer)
+        self.__build_data()
 
-    def __read_single_trace_header(self, header_pointer: int) -> None:
+    def __build_data(self) -> None:
         """
-        Reads a single trace header and all trace elements associated with it
+        Builds the columns of the events DataFrame from the events of all the
+        trace lines
         """
-        self.file.seek(header_pointer)
-
-        # Index of a profile listed in the profile.db (u32)
-        profile_index = int.from_bytes(
-            self.file.read(4), byteorder=self.byte_order, signed=self.signed
-        )
-        hit = self.profile_reader.get_hit_from_profile(profile_index)
-
-        # empty space
-        self.file.read(4)
-        # Pointer to the first element of the trace line (array)
-        start_pointer = int.from_bytes(
-            self.file.read(8), byteorder=self.byte_order, signed=self.signed
-        )
-        # Pointer to the after-end element of the trace line (array)
-        end_pointer = int.from_bytes(
-            self.file.read(8), byteorder=self.byte_order, signed=self.signed
+        events = _TraceEvents.concatenate(self.events)
+
+        # The events need to be sorted by timestamp, keeping the order the
+        # events were added in for events at the same timestamp (many events
+        # occur at the same timestamp). Each trace line is already in
+        # timestamp order, so a stable sort on the timestamps alone merges
+        # them. We sort the few per-event arrays here, once, and build every
+        # column already in order, instead of sorting the whole DataFrame.
+        order = np.argsort(events.timestamps, kind="stable")
+        timestamps = events.timestamps[order]
+        nids = events.nids[order]
+        leaves = events.leaves[order]
+
+        # the trace line of each event, to spread the identifiers of the
+        # trace lines over their events
+        num_events = [len(line_events) for line_events in self.events]
+        line_indices = np.repeat(
+            np.arange(len(num_events), dtype=np.int32), num_events
+        )[order]
+
+        # Everything about an event except for its timestamp, type and
+        # identifiers only depends on its node, so we look up the context
+        # information once per node that has events, in tables indexed by
+        # nid, and spread it over the events by indexing the tables with
+        # their nids (without having to sort the nids to find the distinct
+        # ones)
+        num_nodes = len(self.meta_reader.nodes)
+        has_events = np.zeros(num_nodes, dtype=np.bool_)
+        has_events[nids] = True
+        used_nids = np.flatnonzero(has_events)
+
+        node_column = np.empty(num_nodes, dtype=object)
+        name_column = np.empty(num_nodes, dtype=object)
+        file_column = np.empty(num_nodes, dtype=object)
+        line_column = np.empty(num_nodes, dtype=object)
+        context_id_column = np.zeros(num_nodes, dtype=np.int64)
+        loop_column = np.zeros(num_nodes, dtype=np.bool_)
+        for nid in used_nids.tolist():
+            context_id = self.meta_reader.nid_to_ctx[nid]
+            context_information = self.meta_reader.get_information_from_context_id(
+                context_id
+            )
+            node_column[nid] = self.meta_reader.nodes[nid]
+            name_column[nid] = str(context_information["function"])
+            file_column[nid] = context_information["file"]
+            line_column[nid] = context_information["line"]
+            context_id_column[nid] = context_id
+            loop_column[nid] = context_information["loop_type"]
+
+        # The categorical columns are encoded right here, from the small
+        # per-node and per-trace-line tables, instead of building a column of
+        # Python objects first and having pandas hash all of them again.
+
+        # HPCViewer only puts loops in CCT, but not trace view, so
+        # we use a special Loop Enter/Leave event type
+        event_type_codes = leaves + 2 * loop_column[nids]
+        event_type = pd.Categorical.from_codes(
+            event_type_codes, ["Enter", "Leave", "Loop Enter", "Loop Leave"]
+        ).remove_unused_categories()
+
+        # the names are only encoded for the nodes that have events
+        names, used_name_codes = np.unique(name_column[used_nids], return_inverse=True)
+        name_codes = np.full(num_nodes, -1, dtype=np.int64)
+        name_codes[used_nids] = used_name_codes
+        name = pd.Categorical.from_codes(name_codes[nids], names)
+
+        # (one empty tuple per identifier if there are no trace lines at all)
+        processes, threads, hosts, cores = (
+            tuple(zip(*self.event_identifiers)) if self.event_identifiers else [()] * 4
         )
 
-        self.file.seek(start_pointer)
+        self.data = {
+            "Timestamp (ns)": timestamps,
+            "Event Type": event_type,
+            "Name": name,
+            "Thread": self.__encode_identifier(threads, line_indices),
+            "Process": self.__encode_identifier(processes, line_indices),
+            "Core": np.array(cores, dtype=object)[line_indices],
+            "Host": self.__encode_identifier(hosts, line_indices),
+            "Node": node_column[nids],
+            "Source File Name": file_column[nids],
+            "Source File Line Number": line_column[nids],
+            "Calling Context ID": context_id_column[nids],
+        }
 
-        # setting up some variables
-        last_id = -1  # refers to the previous context id
-        last_node: Node = None  # refers to the node associated with the last context
-        context_id: int = -1  # refers to the current context id
-        current_node: Node = (
-            None  # refers to the current node associated with the current context id
+    def __encode_identifier(
+        self, values: tuple, line_indices: np.ndarray
+    ) -> pd.Categorical:
+        """
+        Builds a categorical column from the identifier of each trace line,
+        given the trace line of every event. Missing (None) identifiers become
+        missing values.
+        """
+        categories = sorted(set(value for value in values if value is not None))
+        value_to_code = {value: code for code, value in enumerate(categories)}
+        value_to_code[None] = -1
+        line_codes = np.array(
+            [value_to_code[value] for value in values], dtype=np.int64
         )
-
-        # refers to the least common ancestor between common_node and last_node
-        # as in finding the node that is the parent of both common_node and last_node
-        common_node: Node = None
-
-        while self.file.tell() < end_pointer:
-            # Timestamp (nanoseconds since epoch)
-            timestamp = (
-                int.from_bytes(
-                    self.file.read(8), byteorder=self.byte_order, signed=self.signed
-                )
-                - self.min_time_stamp
-            )
-
-            # Sample calling context id (in meta.db)
-            # can use this to get name of function from meta.db
-            # Procedure tab
-            context_id = int.from_bytes(
-                self.file.read(4), byteorder=self.byte_order, signed=self.signed
-            )
-
-            if context_id == last_id:
-                # nothing changed between samples.
-                # means we don't have to do anything
-                continue
-            elif context_id == 0:
-                # process is idling
-                current_node = None
-            else:
-                # at a new non-idle context
-                current_node = self.meta_reader.node_map[context_id]
-
-            # First we want to close all the "enter" events from the last sample
-            # that aren't still running
-            if last_node is not None:
-                if current_node is None:
-                    common_node: Node = None
-                else:
-                    common_node: Node = current_node.get_intersection(last_node)
-
-                # closing each "enter" column until we reach the common_node
-                while last_node != common_node:
-                    curr_ctx_id = self.meta_reader.nid_to_ctx[last_node._pipit_nid]
-                    context_information = (
-                        self.meta_reader.get_information_from_context_id(curr_ctx_id)
-                    )
-
-                    self.data["Name"].append(str(context_information["function"]))
-                    if context_information["loop_type"]:
-                        # HPCViewer only puts loops in CCT, but not trace view, so
-                        # we use a special Loop Enter/Leave event type
-                        self.data["Event Type"].append("Loop Leave")
-                    else:
-                        self.data["Event Type"].append("Leave")
-                    self.data["Timestamp (ns)"].append(timestamp)
-                    self.data["Process"].append(hit["RANK"])
-                    self.data["Thread"].append(hit["THREAD"])
-                    self.data["Host"].append(hit["NODE"])
-                    self.data["Core"].append(hit["CORE"])
-                    self.data["Node"].append(last_node)
-                    self.data["Source File Name"].append(context_information["file"])
-                    self.data["Source File Line Number"].append(
-                        context_information["line"]
-                    )
-                    self.data["Calling Context ID"].append(curr_ctx_id)
-
-                    last_node = last_node.parent
-            # Now we want to add all the new "enter" events after
-            # the common_node event
-            if current_node is not None:
-                if common_node is None:
-                    intersect_level = -1
-                else:
-                    intersect_level = common_node.get_level()
-                entry_nodes = current_node.get_node_list(intersect_level)
-                for i in range(len(entry_nodes)):
-                    entry_node = entry_nodes[-1 * i - 1]
-                    curr_ctx_id = self.meta_reader.nid_to_ctx[entry_node._pipit_nid]
-                    context_information = (
-                        self.meta_reader.get_information_from_context_id(curr_ctx_id)
-                    )
-
-                    self.data["Name"].append(str(context_information["function"]))
-                    if context_information["loop_type"]:
-                        # HPCViewer only puts loops in CCT, but not trace view, so
-                        # we use a special Loop Enter/Leave event type
-                        self.data["Event Type"].append("Loop Enter")
-                    else:
-                        self.data["Event Type"].append("Enter")
-                    self.data["Timestamp (ns)"].append(timestamp)
-                    self.data["Process"].append(hit["RANK"])
-                    self.data["Thread"].append(hit["THREAD"])
-                    self.data["Host"].append(hit["NODE"])
-                    self.data["Core"].append(hit["CORE"])
-                    self.data["Node"].append(entry_node)
-                    self.data["Source File Name"].append(context_information["file"])
-                    self.data["Source File Line Number"].append(
-                        context_information["line"]
-                    )
-                    self.data["Calling Context ID"].append(curr_ctx_id)
-
-            last_node = current_node
-            last_id = context_id
-
-        # Now we want to close all the "enter" events from the last sample
-        current_node = None
-        timestamp = self.max_time_stamp - self.min_time_stamp
-        if last_node is not None:
-            if current_node is None:
-                common_node: Node = None
-            else:
-                common_node: Node = current_node.get_intersection(last_node)
-
-            # closing each "enter" column until we reach the common_node
-            while last_node != common_node:
-                curr_ctx_id = self.meta_reader.nid_to_ctx[last_node._pipit_nid]
-                context_information = self.meta_reader.get_information_from_context_id(
-                    curr_ctx_id
-                )
-
-                self.data["Name"].append(str(context_information["function"]))
-                if context_information["loop_type"]:
-                    self.data["Event Type"].append("Loop Leave")
-                else:
-                    self.data["Event Type"].append("Leave")
-                self.data["Timestamp (ns)"].append(timestamp)
-                self.data["Process"].append(hit["RANK"])
-                self.data["Thread"].append(hit["THREAD"])
-                self.data["Host"].append(hit["NODE"])
-                self.data["Core"].append(hit["CORE"])
-                self.data["Node"].append(last_node)
-                self.data["Source File Name"].append(context_information["file"])
-                self.data["Source File Line Number"].append(context_information["line"])
-                self.data["Calling Context ID"].append(curr_ctx_id)
-                last_node = last_node.parent
+        return pd.Categorical.from_codes(line_codes[line_indices], pd.Index(categories))
 
 
 class HPCToolkitReader:
-    def __init__(self, directory: str) -> None:
+    def __init__(self, directory: str, num_processes=None) -> None:
         self.meta_reader: MetaReader = MetaReader(directory + "/meta.db")
         self.profile_reader = ProfileReader(directory + "/profile.db", self.meta_reader)
+
+        num_cpus = mp.cpu_count()
+        if num_processes is None or num_processes < 1 or num_processes > num_cpus:
+            # uses all processes to parallelize reading by default
+            num_processes = num_cpus
+
         self.trace_reader = TraceReader(
-            directory + "/trace.db", self.meta_reader, self.profile_reader
+            directory + "/trace.db",
+            self.meta_reader,
+            self.profile_reader,
+            num_processes,
         )
 
     def read(self) -> pipit.trace.Trace:
-        trace_df = pd.DataFrame(self.trace_reader.data)
-        # Need to sort df by timestamp then index
-        # (since many events occur at the same timestamp)
-
-        # rename the index axis, so we can sort with it
-        trace_df.rename_axis("index", inplace=True)
-
-        # sort by timestamp then index
-        trace_df.sort_values(
-            by=["Timestamp (ns)", "index"],
-            axis=0,
-            ascending=True,
-            inplace=True,
-            ignore_index=True,
-        )
-
-        trace_df = trace_df.astype(
-            {
-                "Event Type": "category",
-                "Name": "category",
-                "Thread": "category",
-                "Process": "category",
-                "Host": "category",
-            }
-        )
+        # The columns are already built as arrays (or categoricals) of the
+        # right types, and already sorted by timestamp, so let the DataFrame
+        # take them over as they are, instead of copying every one of them
+        trace_df = pd.DataFrame(self.trace_reader.data, copy=False)
 
         # cct is needed to create trace in hpctoolkit,
         # so always return it as part of the trace
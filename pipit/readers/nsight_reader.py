@@ -3,6 +3,7 @@
 #
 # SPDX-License-Identifier: MIT
 
+import numpy as np
 import pandas as pd
 import pipit.trace
 
@@ -21,88 +22,89 @@ class NsightReader:
         utilizes pandas to convert it from a csv into a dataframe.
         """
 
-        # Read in csv
-        self.df = pd.read_csv(self.file_name)
-
-        # Grab the set of the column PID columns to see if
-        # mutliprocess and convert to a list
-        pid = set(self.df["PID"])
+        # Read in csv. The columns we use have known types, so they are
+        # given to the parser instead of having it infer them. The names
+        # repeat a lot, so they are parsed straight into a categorical (with
+        # sorted categories, like astype would), instead of materializing a
+        # Python string per row first. The file is memory-mapped rather than
+        # read through a buffer.
+        self.df = pd.read_csv(
+            self.file_name,
+            dtype={
+                "Start (ns)": np.int64,
+                "End (ns)": np.int64,
+                "PID": np.int64,
+                "TID": np.int64,
+                "Name": "category",
+            },
+            memory_map=True,
+        )
 
         # check if PID and TID are NOT the same. singlethreaded or multithreaded
         if self.df["PID"].equals(self.df["TID"]) is False:
-            # Group the pids together and give each process it's own set of threads
-            for i in pid:
-                # Seeing where the rows of the PIDs match. Grabbing the rows in mask
-                mask = self.df["PID"] == i
-                # Creating a set from the matching PID rows dataframe of the TIDs
-                tid = set(self.df[mask]["TID"])
-                # Getting the TID set, creating a dictionary,
-                # and increment the values (0,1,2,...)
-                tid_dict = dict(zip(tid, range(0, len(tid))))
-                # Grabbing the rows with mask and setting the thread column by
-                # mapping the tids with the tid_dict
-                self.df.loc[mask, "Thread"] = self.df["TID"].map(tid_dict)
-            # Converting Thread from float to int
-            self.df["Thread"] = self.df["Thread"].astype(int)
-
-        # check if PID set is > 1, if so multiprocess or single process
-        if len(pid) > 1:
-            # Set Process column to PID
-            self.df["Process"] = self.df["PID"]
-            # Getting the PID set, creating a dictionary,
-            # and increment the values (0,1,2,...)
-            pid_dict = dict(zip(pid, range(0, len(pid))))
-            # Using the dictionary to replace the Process values
-            self.df["Process"].replace(pid_dict, inplace=True)
-
-        # Copy self.df to create enter and leave rows
-        df2 = self.df.copy()
-
-        # Create new columns for self.df with start time to create enter rows
-        self.df["Event Type"] = "Enter"
-        self.df["Timestamp (ns)"] = self.df["Start (ns)"]
-
-        # Create new columns for df2 with end time to create leave rows
-        df2["Event Type"] = "Leave"
-        df2["Timestamp (ns)"] = df2["End (ns)"]
-
-        # Combine dataframes together
-        self.df = pd.concat([self.df, df2])
-
-        # Tidy Dataframe
-        self.df.drop(["Start (ns)", "End (ns)"], axis=1, inplace=True)
-
-        self.df.sort_values(by="Timestamp (ns)", ascending=True, inplace=True)
-
-        self.df.reset_index(drop=True, inplace=True)
-
-        self.df = self.df.astype(
-            {
-                "Event Type": "category",
-                "Name": "category",
-                "PID": "category",
-                "TID": "category",
-            }
+            # Give each process it's own set of threads, numbered (0,1,2,...)
+            # in the order of their TIDs. The dense rank of the TIDs within
+            # each PID does that for all processes in one go.
+            self.df["Thread"] = (
+                self.df.groupby("PID", sort=False)["TID"]
+                .rank(method="dense")
+                .astype(int)
+                - 1
+            )
+
+        # check if there is more than one PID, if so multiprocess or single
+        # process
+        if self.df["PID"].nunique() > 1:
+            # Number the processes (0,1,2,...) in the order of their PIDs
+            self.df["Process"] = self.df["PID"].rank(method="dense").astype(int) - 1
+
+        # The PIDs and TIDs are only needed as categoricals from here on.
+        # Converting them before every row is doubled into an enter and a
+        # leave row below only has to hash half as many values, and the
+        # doubled columns then just gather the category codes.
+        self.df = self.df.astype({"PID": "category", "TID": "category"})
+
+        # Every row of the csv becomes an enter row at its start time and a
+        # leave row at its end time, and the events need to be sorted by
+        # timestamp. We only sort the timestamps (the sort order is the same
+        # as sort_values on the combined dataframe would give), and then
+        # gather every column straight from the csv columns in sorted order,
+        # instead of copying the whole dataframe for the leave rows,
+        # concatenating the copies and sorting all the columns again.
+        num_rows = len(self.df)
+        timestamps = np.concatenate(
+            (self.df["Start (ns)"].to_numpy(), self.df["End (ns)"].to_numpy())
         )
-
-        # Grabbing the list of columns and rearranging them to put
-        # Timestamp, Event Types, Name, Thread (potentially),
-        # Process(potentially) in the front of the dataframe
-        cols = list(self.df)
-        cols.insert(0, cols.pop(cols.index("Timestamp (ns)")))
-        cols.insert(1, cols.pop(cols.index("Event Type")))
-        cols.insert(2, cols.pop(cols.index("Name")))
-
-        if "Process" in self.df.columns:
-            cols.insert(3, cols.pop(cols.index("Process")))
-            if "Thread" in self.df.columns:
-                cols.insert(3, cols.pop(cols.index("Thread")))
-
-        elif "Thread" in self.df.columns:
-            cols.insert(3, cols.pop(cols.index("Thread")))
-
-        # Applying the column list to the dataframe to rearrange
-        self.df = self.df.loc[:, cols]
+        order = np.argsort(timestamps, kind="quicksort")
+        # the row of the csv, and whether it is the leave row, of every event
+        rows = order % num_rows if num_rows else order
+        leaves = order >= num_rows
+
+        data = {
+            "Timestamp (ns)": timestamps[order],
+            # The event types are built directly as a categorical with both
+            # event types as categories, so that pandas never has to look at a
+            # string per row to find the categories
+            "Event Type": pd.Categorical.from_codes(
+                leaves.astype(np.int8), ["Enter", "Leave"]
+            ),
+        }
+
+        # The columns are added in their final order, to put Timestamp,
+        # Event Types, Name, Thread (potentially), Process (potentially) in
+        # the front of the dataframe, followed by the rest of the columns of
+        # the csv. That way the dataframe never has to be rearranged.
+        leading = ["Name"] + [
+            column for column in ("Thread", "Process") if column in self.df.columns
+        ]
+        trailing = [
+            column
+            for column in self.df.columns
+            if column not in leading and column not in ("Start (ns)", "End (ns)")
+        ]
+        for column in leading + trailing:
+            data[column] = self.df[column].array.take(rows)
+        self.df = pd.DataFrame(data)
 
         trace = pipit.trace.Trace(None, self.df)
         if self.create_cct:
@@ -0,0 +1,57 @@
+# Copyright 2023 Parallel Software and Systems Group, University of Maryland.
+# See the top-level LICENSE file for details.
+#
+# SPDX-License-Identifier: MIT
+
+import pandas as pd
+from pipit.util.cct import create_cct
+
+
+def test_create_cct():
+    events = pd.DataFrame(
+        [
+            [0, "Enter", "main", 0],
+            [1, "Enter", "main", 1],
+            [2, "Enter", "foo", 0],
+            [3, "Enter", "bar", 1],
+            [4, "Enter", "bar", 0],
+            # foo is left before bar, which was entered after it
+            [5, "Leave", "foo", 0],
+            # there is no baz to leave
+            [6, "Leave", "baz", 0],
+            [7, "Leave", "bar", 1],
+            [8, "Leave", "bar", 0],
+            # main is the only function left, so foo is entered below it again
+            [9, "Enter", "foo", 0],
+            [10, "Leave", "foo", 0],
+            [11, "Leave", "main", 0],
+            [12, "Leave", "main", 1],
+        ],
+        columns=["Timestamp (ns)", "Event Type", "Name", "Process"],
+    )
+
+    cct = create_cct(events)
+
+    # main -> foo -> bar, and main -> bar
+    assert len(cct.roots) == 1
+    main = cct.roots[0]
+    assert main.parent is None
+    assert main.level == 0
+    assert len(main.children) == 2
+
+    foo = [node for node in main.children if len(node.children) == 1][0]
+    bar = [node for node in main.children if node is not foo][0]
+    assert foo.parent is main and foo.level == 1
+    assert bar.parent is main and bar.level == 1
+    assert bar.children == []
+
+    foo_bar = foo.children[0]
+    assert foo_bar.parent is foo and foo_bar.level == 2
+    assert foo_bar.children == []
+
+    # every Enter event refers to the node of its call path, and the Leave
+    # events don't refer to any node
+    expected = [main, main, foo, bar, foo_bar] + [None] * 4 + [foo] + [None] * 3
+    assert len(events["Graph_Node"]) == len(expected)
+    for node, expected_node in zip(events["Graph_Node"], expected):
+        assert node is expected_node
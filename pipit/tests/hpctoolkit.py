@@ -3,8 +3,19 @@
 #
 # SPDX-License-Identifier: MIT
 
+import multiprocessing as mp
+import os
+import struct
+
 from pipit import Trace
+from pipit.graph import Node
+from pipit.readers.hpctoolkit_reader import (
+    _TRACE_ELEMENT,
+    _node_minima,
+    _read_trace_line,
+)
 import numpy as np
+import pandas as pd
 
 
 def test_events(ping_pong_hpct_trace):
@@ -96,3 +107,136 @@ def test_events(ping_pong_hpct_trace):
 
     # Timestamps should be sorted in increasing order
     assert (np.diff(events_df["Timestamp (ns)"]) >= 0).all()
+
+
+def test_empty_trace(ping_pong_hpct_trace):
+    # set the number of traces in the Context Trace Headers section of trace.db
+    # to 0, which leaves a trace without any trace lines
+    with open(os.path.join(str(ping_pong_hpct_trace), "trace.db"), "r+b") as file:
+        file.seek(24)
+        (section_pointer,) = struct.unpack("<Q", file.read(8))
+        file.seek(section_pointer + 8)
+        file.write(struct.pack("<I", 0))
+
+    events_df = Trace.from_hpctoolkit(str(ping_pong_hpct_trace)).events
+
+    assert events_df.shape == (0, 0)
+
+
+def test_num_processes(ping_pong_hpct_trace, monkeypatch):
+    # the number of processes is capped at the number of CPUs, so pretend
+    # there are enough of them to read the trace lines in parallel
+    monkeypatch.setattr(mp, "cpu_count", lambda: 2)
+
+    # reading the trace lines in parallel gives the same events as reading
+    # them in a single process
+    pd.testing.assert_frame_equal(
+        Trace.from_hpctoolkit(str(ping_pong_hpct_trace), 1).events,
+        Trace.from_hpctoolkit(str(ping_pong_hpct_trace), 2).events,
+    )
+
+
+def test_read_trace_line():
+    random = np.random.RandomState(0)
+
+    for _ in range(200):
+        # A random forest of nodes, numbered in preorder like MetaReader does:
+        # the parent of every new node is on the path from the previous node up
+        # to its root, unless the new node starts another tree
+        nodes = []
+        for nid in range(random.randint(1, 40)):
+            if nid == 0 or random.rand() < 0.1:
+                parent = None
+            else:
+                path = nodes[-1].get_node_list(-1)
+                parent = path[random.randint(len(path))]
+            node = Node(nid, parent)
+            if parent is not None:
+                parent.add_child(node)
+            nodes.append(node)
+
+        node_parent = np.array(
+            [-1 if node.parent is None else node.parent._pipit_nid for node in nodes]
+            + [-1],
+            dtype=np.int32,
+        )
+        node_level = np.array(
+            [node.level for node in nodes] + [-1],
+            dtype=np.int32,
+        )
+
+        # every node gets a context id, and some get a second one (context id 0
+        # is idle)
+        context_ids = random.permutation(np.arange(1, 3 * len(nodes)))
+        context_nid = np.full(3 * len(nodes), -1, dtype=np.int32)
+        context_nid[context_ids[: len(nodes)]] = np.arange(len(nodes))
+        context_nid[context_ids[len(nodes) : 2 * len(nodes)]] = random.randint(
+            len(nodes), size=len(nodes)
+        )
+        context_ids = context_ids[: 2 * len(nodes)]
+
+        # samples of random contexts, some of them idle or repeating the
+        # context of the previous sample
+        samples = []
+        for _ in range(random.randint(0, 40)):
+            if samples and random.rand() < 0.3:
+                samples.append(samples[-1])
+            elif random.rand() < 0.2:
+                samples.append(0)
+            else:
+                samples.append(context_ids[random.randint(len(context_ids))])
+        trace_line = np.empty(len(samples), dtype=_TRACE_ELEMENT)
+        trace_line["timestamp"] = np.sort(random.randint(100, 10000, len(samples)))
+        trace_line["context_id"] = samples
+        buffer = trace_line.tobytes()
+
+        events = _read_trace_line(
+            buffer,
+            0,
+            len(buffer),
+            50,
+            20000,
+            node_parent,
+            node_level,
+            _node_minima(node_parent, node_level),
+            context_nid,
+        )
+
+        # Walk the nodes from one sample to the next, leaving the nodes below
+        # their least common ancestor and entering the new ones from the top
+        expected = []
+        last_node = None
+        for timestamp, context_id in trace_line.tolist():
+            timestamp -= 50
+            if context_id == 0:
+                current_node = None
+            else:
+                current_node = nodes[context_nid[context_id]]
+
+            if current_node is None or last_node is None:
+                common_node = None
+            else:
+                common_node = current_node.get_intersection(last_node)
+            common_level = -1 if common_node is None else common_node.level
+
+            for node in last_node.get_node_list(common_level) if last_node else []:
+                expected.append((timestamp, node._pipit_nid, True))
+            if current_node is not None:
+                for node in reversed(current_node.get_node_list(common_level)):
+                    expected.append((timestamp, node._pipit_nid, False))
+            last_node = current_node
+
+        if last_node is not None:
+            for node in last_node.get_node_list(-1):
+                expected.append((20000 - 50, node._pipit_nid, True))
+
+        assert (
+            list(
+                zip(
+                    events.timestamps.tolist(),
+                    events.nids.tolist(),
+                    events.leaves.tolist(),
+                )
+            )
+            == expected
+        )
@@ -0,0 +1,59 @@
+# Copyright 2022-2023 Parallel Software and Systems Group, University of
+# Maryland. See the top-level LICENSE file for details.
+#
+# SPDX-License-Identifier: MIT
+
+import os
+
+from pipit import Trace
+import numpy as np
+
+
+def test_events(data_dir):
+    events_df = Trace.from_nsight(os.path.join(data_dir, "nsight.csv")).events
+
+    # every range in the csv becomes an Enter and a Leave event
+    assert len(events_df) == 14
+    assert list(events_df["Event Type"]).count("Enter") == 7
+    assert list(events_df["Event Type"]).count("Leave") == 7
+
+    # Timestamps should be sorted in increasing order
+    assert (np.diff(events_df["Timestamp (ns)"]) >= 0).all()
+
+    # Timestamp, Event Type, Name, Thread and Process come first, followed by
+    # the rest of the columns of the csv (without the start and end times)
+    assert list(events_df.columns) == [
+        "Timestamp (ns)",
+        "Event Type",
+        "Name",
+        "Thread",
+        "Process",
+        "Duration (ns)",
+        "DurChild (ns)",
+        "DurNonChild (ns)",
+        "PID",
+        "TID",
+        "Lvl",
+        "NumChild",
+        "RangeId",
+        "ParentId",
+        "RangeStack",
+        "NameTree",
+    ]
+
+    # processes are numbered in the order of their PIDs, and the threads of
+    # each process in the order of their TIDs
+    assert dict(zip(events_df["PID"], events_df["Process"])) == {100: 0, 200: 1}
+    assert dict(zip(zip(events_df["PID"], events_df["TID"]), events_df["Thread"])) == {
+        (100, 100): 0,
+        (100, 120): 1,
+        (200, 200): 0,
+        (200, 210): 1,
+        (200, 230): 2,
+    }
+
+    # the repeating columns are categorical
+    for column in ["Event Type", "Name", "PID", "TID"]:
+        assert events_df[column].dtype == "category"
+    assert list(events_df["Event Type"].cat.categories) == ["Enter", "Leave"]
+    assert list(events_df["Name"].cat.categories) == ["bar", "foo", "main"]
@@ -43,12 +43,12 @@ class Trace:
         return OTF2Reader(dirname, num_processes, create_cct).read()
 
     @staticmethod
-    def from_hpctoolkit(dirname):
+    def from_hpctoolkit(dirname, num_processes=None):
         """Read an HPCToolkit trace into a new Trace object."""
         # import this lazily to avoid circular dependencies
         from .readers.hpctoolkit_reader import HPCToolkitReader
 
-        return HPCToolkitReader(dirname).read()
+        return HPCToolkitReader(dirname, num_processes).read()
 
     @staticmethod
     def from_projections(dirname, num_processes=None, create_cct=False):
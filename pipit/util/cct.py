@@ -3,6 +3,7 @@
 #
 # SPDX-License-Identifier: MIT
 
+import pandas as pd
 from pipit.graph import Graph, Node
 
 
@@ -21,6 +22,12 @@ def create_cct(events):
     # determines whether a node exists or not
     callpath_to_node = dict()
 
+    # Every call path gets an integer id, which is looked up from the id of
+    # the call path of its parent and the name of the function, so that a
+    # call path never has to be joined into a string (which would take time
+    # proportional to its depth for every Enter event)
+    callpath_ids = dict()
+
     node_id = 0  # each node has a unique id
 
     # Filter the DataFrame to only Enter/Leave
@@ -29,48 +36,63 @@ def create_cct(events):
     # list of processes and/or threads to iterate over
     if "Thread" in events.columns:
         exec_locations = set(zip(events["Process"], events["Thread"]))
-        has_thread = True
+        location_columns = ["Process", "Thread"]
     else:
         exec_locations = set(events["Process"])
-        has_thread = False
+        location_columns = "Process"
+
+    # The positions of the events of every process and/or thread, found in a
+    # single pass over the DataFrame instead of filtering it once per
+    # location
+    location_positions = enter_leave_df.groupby(
+        location_columns, sort=False, observed=True
+    ).indices
+
+    """
+    Iterating over arrays instead of
+    DataFrame columns is more efficient,
+    so the columns are extracted only once.
+    The loop below also only compares and hashes
+    integers: functions are identified by the
+    integer code of their name, and events by
+    whether they are Enter events
+    """
+    all_df_indices = enter_leave_df.index.to_numpy()
+    all_function_names = pd.factorize(enter_leave_df["Name"])[0]
+    all_enters = (enter_leave_df["Event Type"] == "Enter").to_numpy()
 
     for curr_loc in exec_locations:
-        # only filter by thread if the trace has a thread column
-        if has_thread:
-            curr_process, curr_thread = curr_loc
-            filtered_df = enter_leave_df.loc[
-                (enter_leave_df["Process"] == curr_process)
-                & (enter_leave_df["Thread"] == curr_thread)
-            ]
-        else:
-            filtered_df = enter_leave_df.loc[(enter_leave_df["Process"] == curr_loc)]
-
-        curr_depth, callpath = 0, ""
-
-        """
-        Iterating over lists instead of
-        DataFrame columns is more efficient
-        """
-        df_indices = filtered_df.index.to_list()
-        function_names = filtered_df["Name"].to_list()
-        event_types = filtered_df["Event Type"].to_list()
+        # locations without any Enter/Leave events have nothing to add
+        positions = location_positions.get(curr_loc)
+        if positions is None:
+            continue
+
+        curr_depth = 0
+
+        df_indices = all_df_indices[positions].tolist()
+        function_names = all_function_names[positions].tolist()
+        enters = all_enters[positions].tolist()
 
         # stacks used to iterate through the trace and add nodes to the cct
-        functions_stack, nodes_stack = [], []
+        functions_stack, nodes_stack, callpaths_stack = [], [], []
 
         # iterating over the events of the current thread's trace
-        for i in range(len(filtered_df)):
-            curr_df_index, evt_type, function_name = (
+        for i in range(len(df_indices)):
+            curr_df_index, is_enter, function_name = (
                 df_indices[i],
-                event_types[i],
+                enters[i],
                 function_names[i],
             )
 
             # encounter a new function through its entry point.
-            if evt_type == "Enter":
+            if is_enter:
                 # add the function to the stack and get the call path
                 functions_stack.append(function_name)
-                callpath = "->".join(functions_stack)
+                parent_callpath = callpaths_stack[-1] if callpaths_stack else -1
+                callpath = callpath_ids.setdefault(
+                    (parent_callpath, function_name), len(callpath_ids)
+                )
+                callpaths_stack.append(callpath)
 
                 # get the parent node of the function if it exists
                 parent_node = None if curr_depth == 0 else nodes_stack[-1]
@@ -108,7 +130,16 @@ def create_cct(events):
                     # update stacks and current depth
                     del functions_stack[j + 1]
                     del nodes_stack[j + 1]
+                    del callpaths_stack[j + 1]
                     curr_depth -= 1
+
+                    # if the function wasn't the last one entered, the call
+                    # paths of the functions entered after it have changed
+                    for k in range(j + 1, len(callpaths_stack)):
+                        parent_callpath = callpaths_stack[k - 1] if k > 0 else -1
+                        callpaths_stack[k] = callpath_ids.setdefault(
+                            (parent_callpath, functions_stack[k]), len(callpath_ids)
+                        )
                 else:
                     continue
 